@@ -0,0 +1,87 @@
+"""Compare CSV and column-store loads of a wide synthetic panel.
+
+Each load runs in a fresh interpreter so time (excluding the pandas
+import) and peak RSS are measured from a cold start. Run from the repository root:
+
+    python benchmarks/bench_column_store.py --countries 200 --years 60 --indicators 1000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC)
+
+from column_store import store_path, write_table
+
+LOADER = """
+import json, sys, time
+sys.path.insert(0, {src!r})
+import pandas as pd
+from column_store import read_table
+start = time.perf_counter()
+mode, path, columns = sys.argv[1], sys.argv[2], json.loads(sys.argv[3])
+if mode == 'csv':
+    df = pd.read_csv(path, usecols=columns)
+else:
+    df = read_table(path, columns)
+# Touch one indicator the way a chart would
+total = float(df['Indicator_0000'].sum())
+elapsed = time.perf_counter() - start
+# VmHWM starts fresh at exec, unlike ru_maxrss which is inherited from the parent
+with open('/proc/self/status') as f:
+    peak_kb = next(int(line.split()[1]) for line in f if line.startswith('VmHWM'))
+print(json.dumps({{'seconds': elapsed, 'max_rss_mb': peak_kb / 1024}}))
+"""
+
+
+def synthetic_panel(countries, years, indicators, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.MultiIndex.from_product(
+        [[f"Country {i:03d}" for i in range(countries)], range(2024 - years, 2024)], names=['Country', 'Year'])
+    values = rng.normal(size=(len(index), indicators))
+    values[rng.random(values.shape) < 0.1] = np.nan
+    df = pd.DataFrame(values, index=index, columns=[f"Indicator_{i:04d}" for i in range(indicators)])
+    return df.reset_index()
+
+
+def load(mode, path, columns):
+    out = subprocess.run([sys.executable, '-c', LOADER.format(src=SRC), mode, path, json.dumps(columns)],
+                         check=True, capture_output=True, text=True)
+    return json.loads(out.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--countries', type=int, default=200)
+    parser.add_argument('--years', type=int, default=60)
+    parser.add_argument('--indicators', type=int, default=1000)
+    args = parser.parse_args()
+
+    df = synthetic_panel(args.countries, args.years, args.indicators)
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'panel.csv')
+        df.to_csv(csv_path, index=False)
+        write_table(df, store_path(csv_path))
+        del df
+
+        projected = ['Country', 'Year', 'Indicator_0000', 'Indicator_0001']
+        print(f"{'load':<28}{'seconds':>10}{'peak RSS MB':>14}")
+        for label, mode, path, columns in [
+            ('csv, all columns', 'csv', csv_path, None),
+            ('store, all columns', 'store', store_path(csv_path), None),
+            ('csv, 4 columns', 'csv', csv_path, projected),
+            ('store, 4 columns', 'store', store_path(csv_path), projected),
+        ]:
+            result = load(mode, path, columns)
+            print(f"{label:<28}{result['seconds']:>10.3f}{result['max_rss_mb']:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
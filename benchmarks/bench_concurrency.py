@@ -0,0 +1,79 @@
+"""Benchmark the shared FetchExecutor against local servers with artificial latency.
+
+Run from the repository root:
+
+    python benchmarks/bench_concurrency.py --latency 0.05
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from country_registry import load_registry
+from fetch_worldbank_data import fetch_worldbank_data
+from http_client import FetchExecutor
+from mock_servers import MockServer, worldbank_handler, wikipedia_handler
+import scrape_economic_data
+
+INFOBOX_PAGE = """<html><body><table class="infobox"><tbody>
+<tr><th>GDP growth</th><td>2.5% (2023)</td></tr>
+<tr><th>Inflation (CPI)</th><td>3.1% (2023)</td></tr>
+</tbody></table></body></html>"""
+
+
+def run_quietly(fn, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        return fn(*args, **kwargs)
+
+
+def bench_worldbank(server, workers, indicators):
+    countries = load_registry().economies()
+    with FetchExecutor(max_workers=workers, rate_limits={}) as executor:
+        start = time.perf_counter()
+        df = run_quietly(fetch_worldbank_data, countries, indicators, batch_size=5,
+                         base_url=f"{server.url}/v2", executor=executor)
+        return time.perf_counter() - start, df
+
+
+def bench_wikipedia(server, workers):
+    with FetchExecutor(max_workers=workers, rate_limits={}) as executor:
+        start = time.perf_counter()
+        records = run_quietly(executor.map, lambda c: scrape_economic_data.scrape_wikipedia_economic_data(
+            c, executor, base_url=f"{server.url}/wiki"), scrape_economic_data.countries)
+        return time.perf_counter() - start, records
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds added to each response')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    args = parser.parse_args()
+
+    indicators = {f"IND.{i}": f"Indicator_{i}" for i in range(4)}
+    pages = {c: INFOBOX_PAGE for c in scrape_economic_data.countries}
+
+    print(f"{'source':<12}{'workers':>8}{'requests':>10}{'seconds':>10}{'speedup':>9}")
+    for name, handler, bench in [
+        ('worldbank', worldbank_handler, lambda s, w: bench_worldbank(s, w, indicators)),
+        ('wikipedia', wikipedia_handler(pages), bench_wikipedia),
+    ]:
+        baseline = reference = None
+        for workers in args.workers:
+            with MockServer(handler, latency=args.latency) as server:
+                elapsed, result = bench(server, workers)
+                requests_made = server.requests
+            if reference is None:
+                baseline, reference = elapsed, result
+            elif hasattr(result, 'equals'):
+                assert result.equals(reference), "concurrent output differs from serial run"
+            else:
+                assert result == reference, "concurrent output differs from serial run"
+            print(f"{name:<12}{workers:>8}{requests_made:>10}{elapsed:>10.2f}{baseline / elapsed:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
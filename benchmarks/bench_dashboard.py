@@ -0,0 +1,60 @@
+"""Time dashboard reruns headlessly with Streamlit's AppTest.
+
+Run from the repository root (the dashboard reads data/ relative to it):
+
+    python benchmarks/bench_dashboard.py
+    python benchmarks/bench_dashboard.py --script /path/to/other/dashboard.py
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+from streamlit.testing.v1 import AppTest
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+
+def timed(fn, repeat=1):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--script', default=os.path.join(SRC, 'dashboard.py'))
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    sys.path.insert(0, SRC)
+    at = AppTest.from_file(args.script, default_timeout=120)
+    results = {'first run': timed(at.run)}
+    assert not at.exception, at.exception
+
+    results['rerun, same selection'] = timed(at.run, args.repeat)
+    theme = at.sidebar.selectbox[0]
+
+    def toggle_theme():
+        theme.set_value('Dark' if theme.value == 'Light' else 'Light')
+        at.run()
+    results['theme toggle'] = timed(toggle_theme, args.repeat)
+
+    slider = at.sidebar.slider[0]
+    ranges = iter([(2015 + i % 4, 2023) for i in range(args.repeat * 2)])
+
+    def change_years():
+        slider.set_value(next(ranges))
+        at.run()
+    results['year range change'] = timed(change_years, args.repeat)
+
+    for label, seconds in results.items():
+        print(f"{label:<24}{seconds * 1000:>9.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
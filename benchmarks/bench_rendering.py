@@ -0,0 +1,73 @@
+"""Report figure payload size and build time for SVG and large-panel rendering.
+
+Time to first paint needs a browser, so the server-side cost of building
+and serializing each figure, and the JSON payload the browser must parse,
+are reported instead. Run from the repository root:
+
+    python benchmarks/bench_rendering.py --countries 250 --years 60
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from chart_rendering import cluster_figure, gini_map_figure, trend_figure
+from country_registry import load_registry
+
+
+def current_panels():
+    df_static = pd.read_csv('data/processed_economic_data.csv')
+    df_ts = pd.read_csv('data/processed_worldbank_data.csv')
+    return df_static, df_ts
+
+
+def synthetic_panels(countries, years, seed=0):
+    rng = np.random.default_rng(seed)
+    known = load_registry().names
+    names = list(known) + [f"Country {i}" for i in range(max(0, countries - len(known)))]
+    names = names[:countries]
+    df_ts = pd.DataFrame({
+        'Country': np.repeat(names, years),
+        'Year': np.tile(np.arange(2024 - years, 2024), countries),
+        'GDP_Per_Capita_Growth': rng.normal(2, 3, countries * years).cumsum() / 10,
+    })
+    df_static = pd.DataFrame({
+        'Country': names, 'Year': 2023,
+        'GDP_Per_Capita_Calc': rng.lognormal(9, 1, countries),
+        'Gini_Coefficient': rng.uniform(24, 63, countries),
+        'Unemployment_Rate': rng.uniform(1, 30, countries),
+        'Population_WB': rng.lognormal(16, 1.5, countries),
+        'Cluster': rng.integers(0, 3, countries),
+    })
+    return df_static, df_ts
+
+
+def measure(build, df, large):
+    start = time.perf_counter()
+    payload = build(df, large=large).to_json()
+    return len(payload), time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--countries', type=int, default=250)
+    parser.add_argument('--years', type=int, default=60)
+    args = parser.parse_args()
+
+    print(f"{'dataset':<10}{'chart':<10}{'mode':<8}{'payload KB':>12}{'build ms':>10}")
+    for dataset, (df_static, df_ts) in [('current', current_panels()),
+                                        ('large', synthetic_panels(args.countries, args.years))]:
+        for chart, build, df in [('trend', trend_figure, df_ts), ('scatter', cluster_figure, df_static),
+                                 ('map', gini_map_figure, df_static)]:
+            for mode, large in [('svg', False), ('large', True)]:
+                size, seconds = measure(build, df, large)
+                print(f"{dataset:<10}{chart:<10}{mode:<8}{size / 1024:>12.1f}{seconds * 1000:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""Compare full-tree and infobox-only parsing of Economy_of_* pages.
+
+Run from the repository root. With --corpus, pages are read from
+<corpus>/<Country>.html (use --download to save them first); otherwise
+synthetic pages of similar size are generated:
+
+    python benchmarks/bench_scrape_parse.py --corpus data/bench_corpus --download
+    python benchmarks/bench_scrape_parse.py
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from fixtures import synthetic_economy_page
+from http_client import FetchExecutor
+import scrape_economic_data
+
+
+def load_corpus(corpus, download):
+    countries = scrape_economic_data.countries
+    if corpus is None:
+        return {country: synthetic_economy_page(country) for country in countries}
+    if download:
+        os.makedirs(corpus, exist_ok=True)
+        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
+        with FetchExecutor() as client:
+            responses = client.map(
+                lambda c: client.get(f"https://en.wikipedia.org/wiki/Economy_of_{c}", headers=headers, timeout=30),
+                countries)
+        for country, response in zip(countries, responses):
+            if response.ok:
+                with open(os.path.join(corpus, f"{country}.html"), 'w', encoding='utf-8') as f:
+                    f.write(response.text)
+    pages = {}
+    for country in countries:
+        path = os.path.join(corpus, f"{country}.html")
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                pages[country] = f.read()
+    return pages
+
+
+def measure(html, country, fast):
+    tracemalloc.start()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        record = scrape_economic_data.parse_economy_page(html, country, fast=fast)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return record, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--corpus', help='directory of saved <Country>.html pages')
+    parser.add_argument('--download', action='store_true', help='fetch the pages into --corpus first')
+    args = parser.parse_args()
+
+    pages = load_corpus(args.corpus, args.download)
+    print(f"{'country':<22}{'KB':>7}{'full ms':>9}{'fast ms':>9}{'full MB':>9}{'fast MB':>9}")
+    totals = [0.0, 0.0, 0, 0]
+    for country, html in pages.items():
+        full, full_time, full_peak = measure(html, country, fast=False)
+        fast, fast_time, fast_peak = measure(html, country, fast=True)
+        assert full == fast, f"records differ for {country}"
+        totals = [totals[0] + full_time, totals[1] + fast_time,
+                  max(totals[2], full_peak), max(totals[3], fast_peak)]
+        print(f"{country:<22}{len(html) / 1024:>7.0f}{full_time * 1000:>9.1f}{fast_time * 1000:>9.1f}"
+              f"{full_peak / 2**20:>9.1f}{fast_peak / 2**20:>9.2f}")
+    print(f"{'total / max':<22}{'':>7}{totals[0] * 1000:>9.1f}{totals[1] * 1000:>9.1f}"
+          f"{totals[2] / 2**20:>9.1f}{totals[3] / 2**20:>9.2f}")
+    print(f"speedup: {totals[0] / totals[1]:.1f}x over {len(pages)} pages")
+
+
+if __name__ == '__main__':
+    main()
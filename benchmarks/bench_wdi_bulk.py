@@ -0,0 +1,67 @@
+"""Time the WDI bulk reader on generated ZIPs in the WDI_CSV.zip format.
+
+Reads the same selection from dumps of growing size, each in a fresh
+interpreter, so time and peak RSS can be compared across sizes (peak RSS
+should stay flat). tests/test_wdi_bulk.py checks the output itself. Run
+from the repository root:
+
+    python benchmarks/bench_wdi_bulk.py --indicators 100 1000 4000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import zipfile
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC)
+
+from country_registry import load_registry
+from synthetic import write_wdi_zip
+
+# Selection read from every dump: the nine indicators the fetch stage uses
+SELECTED = {f"SYN.IND.{i:05d}": f"Indicator_{i}" for i in range(9)}
+
+READER = """
+import json, sys, time
+sys.path.insert(0, {src!r})
+from wdi_bulk import read_wdi_bulk
+import metrics
+metrics.configure(quiet=True)
+start = time.perf_counter()
+df = read_wdi_bulk(sys.argv[1], None, json.loads(sys.argv[2]), (2015, 2023))
+elapsed = time.perf_counter() - start
+# VmHWM starts fresh at exec, unlike ru_maxrss which is inherited from the parent
+with open('/proc/self/status') as f:
+    peak_kb = next(int(line.split()[1]) for line in f if line.startswith('VmHWM'))
+print(json.dumps({{'seconds': elapsed, 'max_rss_mb': peak_kb / 1024, 'rows': len(df)}}))
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--countries', type=int, default=50)
+    parser.add_argument('--indicators', type=int, nargs='+', default=[100, 1000],
+                        help="indicators per country in each generated dump")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        economies = load_registry().iso3[:args.countries]
+        print(f"{'dump':<30}{'MB':>8}{'seconds':>10}{'peak RSS MB':>14}")
+        for n in args.indicators:
+            path = os.path.join(tmp, f"wdi_{n}.zip")
+            write_wdi_zip(path, economies, n)
+            with zipfile.ZipFile(path) as archive:
+                size_mb = archive.getinfo('WDICSV.csv').file_size / 2**20
+            out = subprocess.run([sys.executable, '-c', READER.format(src=SRC), path, json.dumps(SELECTED)],
+                                 check=True, capture_output=True, text=True)
+            result = json.loads(out.stdout)
+            label = f"{len(economies)} x {n} indicators"
+            print(f"{label:<30}{size_mb:>8.0f}{result['seconds']:>10.3f}{result['max_rss_mb']:>14.1f}")
+            os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+"""Diff two benchmark result files from run_benchmarks.py.
+
+    python benchmarks/compare.py old.json new.json
+"""
+import argparse
+import json
+
+
+def load(path):
+    with open(path) as f:
+        report = json.load(f)
+    return report['meta'], {(r['name'], r['scale']): r for r in report['results']}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('old')
+    parser.add_argument('new')
+    parser.add_argument('--threshold', type=float, default=1.2, help='flag slowdowns above this ratio')
+    args = parser.parse_args()
+
+    old_meta, old = load(args.old)
+    new_meta, new = load(args.new)
+    print(f"old: {old_meta.get('commit')}  new: {new_meta.get('commit')}")
+    print(f"{'benchmark':<28}{'scale':<10}{'old s':>9}{'new s':>9}{'ratio':>7}{'old MB':>9}{'new MB':>9}")
+    for key in list(old) + [k for k in new if k not in old]:
+        a, b = old.get(key), new.get(key)
+        if a is None or b is None:
+            print(f"{key[0]:<28}{key[1]:<10}{'only in ' + ('new' if a is None else 'old'):>18}")
+            continue
+        ratio = b['seconds'] / a['seconds'] if a['seconds'] else float('inf')
+        flag = '  <-- slower' if ratio > args.threshold else ''
+        print(f"{key[0]:<28}{key[1]:<10}{a['seconds']:>9.3f}{b['seconds']:>9.3f}{ratio:>7.2f}"
+              f"{a['peak_mb']:>9.1f}{b['peak_mb']:>9.1f}{flag}")
+
+
+if __name__ == '__main__':
+    main()
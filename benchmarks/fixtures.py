@@ -0,0 +1,60 @@
+"""Synthetic stand-ins for recorded pages, used when no saved corpus is available."""
+import random
+
+INFOBOX_ROWS = [
+    ('Currency', 'United States dollar (USD)'),
+    ('Population', '{pop} million (2023)[3]'),
+    ('GDP', '${gdp} trillion (nominal; 2025)[5]'),
+    ('GDP growth', '{growth}% (2023)[6]'),
+    ('GDP per capita', '${gdppc} (nominal; 2025)[5]'),
+    ('Inflation (CPI)', '{inflation}% (2023)[7]'),
+    ('Population below poverty line', '{poverty}% (2022)[8]'),
+    ('Gini coefficient', '{gini} medium (2023)[9]'),
+    ('Labor force', '{labor} million (2024)[10]'),
+    ('Unemployment', '{unemployment}% (2024)[11]'),
+    ('Main industries', 'Petroleum, steel, motor vehicles, aerospace, telecommunications, chemicals'),
+    ('Exports', '${exports} billion (2023)'),
+    ('Export goods', 'Machinery, vehicles, chemicals'),
+    ('Imports', '${imports} billion (2023)'),
+    ('Import goods', 'Electronics, fuels, pharmaceuticals'),
+    ('Foreign reserves', '${reserves} billion (2024)[12]'),
+]
+
+
+def synthetic_economy_page(country, paragraphs=400, seed=None):
+    """Build an HTML page shaped like a Wikipedia 'Economy of' article.
+
+    The infobox sits near the top of a large body of paragraphs, tables
+    and navboxes, which is what makes full-tree parsing expensive.
+    """
+    rng = random.Random(seed if seed is not None else country)
+    values = {
+        'pop': round(rng.uniform(1, 1400), 1), 'gdp': round(rng.uniform(0.05, 28), 3),
+        'growth': round(rng.uniform(-3, 8), 1), 'gdppc': f"{rng.randint(500, 120000):,}",
+        'inflation': round(rng.uniform(0, 40), 1), 'poverty': round(rng.uniform(1, 50), 1),
+        'gini': round(rng.uniform(24, 63), 1), 'labor': round(rng.uniform(0.5, 800), 1),
+        'unemployment': round(rng.uniform(1, 30), 1), 'exports': rng.randint(5, 3500),
+        'imports': rng.randint(5, 3500), 'reserves': rng.randint(1, 3500),
+    }
+    rows = ''.join(
+        f'<tr><th scope="row" class="infobox-label">{label}</th>'
+        f'<td class="infobox-data">{value.format(**values)}<sup class="reference">[{i}]</sup></td></tr>'
+        for i, (label, value) in enumerate(INFOBOX_ROWS))
+    name = country.replace('_', ' ')
+    infobox = (f'<table class="infobox vcard"><tbody><tr><th colspan="2" class="infobox-above">'
+               f'Economy of {name}</th></tr>{rows}</tbody></table>')
+    body = []
+    for i in range(paragraphs):
+        words = ' '.join(rng.choice(['trade', 'growth', 'sector', 'policy', 'market', 'export',
+                                     '<a href="/wiki/X">index</a>', 'capital', 'labor', 'output'])
+                         for _ in range(60))
+        body.append(f'<p>{words}<sup class="reference"><a href="#cite_note-{i}">[{i}]</a></sup></p>')
+        if i % 40 == 0:
+            cells = ''.join(f'<tr><td>{y}</td><td>{rng.random():.3f}</td><td>{rng.random():.3f}</td></tr>'
+                            for y in range(1980, 2024))
+            body.append(f'<table class="wikitable"><tr><th>Year</th><th>A</th><th>B</th></tr>{cells}</table>')
+    navbox = ''.join(f'<div class="navbox"><ul>{"".join("<li><a>x</a></li>" for _ in range(200))}</ul></div>'
+                     for _ in range(5))
+    return (f'<!DOCTYPE html><html><head><title>Economy of {name}</title></head><body>'
+            f'<div id="content"><div class="mw-parser-output">{infobox}{"".join(body)}</div>'
+            f'{navbox}</div></body></html>')
@@ -0,0 +1,112 @@
+"""Local stand-ins for the World Bank API and Wikipedia used by the benchmarks."""
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def worldbank_value(country_code, indicator_code, year):
+    """Deterministic fake value, with roughly 15% of cells missing."""
+    rng = random.Random(f"{country_code}|{indicator_code}|{year}")
+    if rng.random() < 0.15:
+        return None
+    return round(rng.random() * 1000, 6)
+
+
+class MockServer:
+    """Threaded HTTP server with artificial per-request latency and a request counter."""
+
+    def __init__(self, handler, latency=0.0):
+        self.latency = latency
+        self.requests = 0
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body go out as separate writes; without this each response waits on a delayed ACK
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                with server.lock:
+                    server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                status, content_type, body = handler(self.path)
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.httpd.server_port}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+# Country metadata served at /v2/country: (iso3, iso2, name, region)
+WORLDBANK_COUNTRIES = [
+    ('USA', 'US', 'United States', 'North America'), ('KOR', 'KR', 'Korea, Rep.', 'East Asia & Pacific'),
+    ('VNM', 'VN', 'Viet Nam', 'East Asia & Pacific'), ('NAM', 'NA', 'Namibia', 'Sub-Saharan Africa'),
+    ('CIV', 'CI', "Cote d'Ivoire", 'Sub-Saharan Africa'), ('COD', 'CD', 'Congo, Dem. Rep.', 'Sub-Saharan Africa'),
+    ('URY', 'UY', 'Uruguay', 'Latin America & Caribbean'), ('WLD', '1W', 'World', 'Aggregates'),
+    ('EUU', 'EU', 'European Union', 'Aggregates'),
+]
+
+
+def worldbank_handler(path):
+    """Serve /v2/country/{codes}/indicator/{code}?date=a:b&page=n like the real API."""
+    url = urlparse(path)
+    parts = url.path.strip('/').split('/')
+    if len(parts) == 2:
+        # Country metadata: /v2/country
+        rows = [{'id': iso3, 'iso2Code': iso2, 'name': name, 'region': {'id': '', 'value': region},
+                 'incomeLevel': {'id': '', 'value': 'Aggregates' if region == 'Aggregates' else 'High income'}}
+                for iso3, iso2, name, region in WORLDBANK_COUNTRIES]
+        meta = {'page': 1, 'pages': 1, 'per_page': len(rows), 'total': len(rows)}
+        return 200, 'application/json', json.dumps([meta, rows]).encode()
+    codes, indicator_code = parts[2].split(';'), parts[4]
+    query = parse_qs(url.query)
+    first, _, last = query['date'][0].partition(':')
+    first, last = int(first), int(last or first)
+    per_page = int(query.get('per_page', ['50'])[0])
+    page = int(query.get('page', ['1'])[0])
+    rows = [
+        {'indicator': {'id': indicator_code, 'value': indicator_code},
+         'country': {'id': code[:2], 'value': code},
+         'countryiso3code': code, 'date': str(year),
+         'value': worldbank_value(code, indicator_code, year)}
+        for code in codes for year in range(last, first - 1, -1)
+    ]
+    pages = max(1, math.ceil(len(rows) / per_page))
+    meta = {'page': page, 'pages': pages, 'per_page': per_page, 'total': len(rows)}
+    body = json.dumps([meta, rows[(page - 1) * per_page:page * per_page]]).encode()
+    return 200, 'application/json', body
+
+
+def wikipedia_handler(pages):
+    """Serve /wiki/Economy_of_{country} from a dict of country -> HTML."""
+    def handler(path):
+        name = urlparse(path).path.rsplit('/', 1)[-1].replace('Economy_of_', '')
+        if name not in pages:
+            return 404, 'text/html', b'Not found'
+        return 200, 'text/html; charset=utf-8', pages[name].encode('utf-8')
+    return handler
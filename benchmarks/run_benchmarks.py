@@ -0,0 +1,225 @@
+"""Reproducible end-to-end benchmark suite for the pipeline's hot paths.
+
+Everything runs offline: the World Bank API is a local mock server with
+configurable latency, Wikipedia pages come from recorded HTML fixtures
+(or synthetic pages), and panels are generated at fixed seeds. Results
+are written as JSON so runs on different commits can be diffed with
+benchmarks/compare.py. Run from the repository root:
+
+    python benchmarks/run_benchmarks.py --output bench_results.json
+    python benchmarks/run_benchmarks.py --scales current medium --latency 0.02
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+import pandas as pd
+
+from fixtures import synthetic_economy_page
+from mock_servers import MockServer, worldbank_handler
+from synthetic import SCALES, country_names, write_pipeline_inputs
+
+
+class Measure:
+    """Wall time and peak memory of a block.
+
+    Peak memory is the growth of VmHWM over the resident set at entry, after
+    resetting the high-water mark through /proc/self/clear_refs; where that is
+    unavailable the tracemalloc peak is reported instead.
+    """
+
+    def __enter__(self):
+        self.rss = _reset_peak_rss()
+        if self.rss:
+            self.baseline = _status_kb('VmRSS')
+        else:
+            tracemalloc.start()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.seconds = time.perf_counter() - self.start
+        if self.rss:
+            self.peak_mb = (_status_kb('VmHWM') - self.baseline) / 1024
+        else:
+            self.peak_mb = tracemalloc.get_traced_memory()[1] / 2**20
+            tracemalloc.stop()
+
+
+def _reset_peak_rss():
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _status_kb(field):
+    with open('/proc/self/status') as f:
+        return next(int(line.split()[1]) for line in f if line.startswith(field + ':'))
+
+
+@contextlib.contextmanager
+def quiet():
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        yield
+
+
+@contextlib.contextmanager
+def working_directory(path):
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def record(results, name, scale, measure, **extra):
+    entry = {'name': name, 'scale': scale, 'seconds': round(measure.seconds, 4),
+             'peak_mb': round(measure.peak_mb, 1), **extra}
+    results.append(entry)
+    print(f"{name:<28}{scale:<10}{entry['seconds']:>10.3f}s{entry['peak_mb']:>10.1f} MB  "
+          + ' '.join(f"{k}={v}" for k, v in extra.items()))
+
+
+def bench_fetch(results, latency, workers):
+    from country_registry import load_registry
+    from fetch_worldbank_data import fetch_worldbank_data
+    from http_client import FetchExecutor
+    indicators = {f"IND.{i}": name for i, name in enumerate(
+        ['GDP_Current_USD', 'GDP_Per_Capita_USD', 'Inflation_Rate_WB', 'Unemployment_Rate_WB',
+         'GDP_Per_Capita_Growth', 'Exports_WB', 'Imports_WB', 'Gini_Coefficient_WB', 'Population_WB'])}
+    for batch_size in (1, 50):
+        with MockServer(worldbank_handler, latency=latency) as server, \
+                FetchExecutor(max_workers=workers, rate_limits={}) as executor, quiet(), Measure() as m:
+            df = fetch_worldbank_data(load_registry().economies(), indicators, batch_size=batch_size,
+                                      base_url=f"{server.url}/v2", executor=executor)
+        record(results, f'fetch_worldbank/batch{batch_size}', 'current', m,
+               requests=server.requests, rows=len(df))
+
+
+def bench_scrape(results, fixtures_dir):
+    import scrape_economic_data
+    from clean_economic_data import clean_infobox_data
+    countries = scrape_economic_data.countries
+    pages = {}
+    for country in countries:
+        path = os.path.join(fixtures_dir, f"{country}.html") if fixtures_dir else None
+        if path and os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                pages[country] = f.read()
+        else:
+            pages[country] = synthetic_economy_page(country)
+    source = 'recorded' if fixtures_dir else 'synthetic'
+    for fast in (False, True):
+        with quiet(), Measure() as m:
+            records = [r for c, html in pages.items() for r in scrape_economic_data.parse_economy_page(html, c, fast=fast) or []]
+        record(results, f"scrape_parse/{'fast' if fast else 'full'}", 'current', m, pages=len(pages), source=source)
+    with Measure() as m:
+        df = clean_infobox_data(pd.DataFrame(records))
+    record(results, 'scrape_clean', 'current', m, rows=len(records), countries=len(df))
+
+
+def bench_preprocess(results, scales, memory_limit_mb):
+    import preprocess_data
+    for scale in scales:
+        shape = SCALES[scale]
+        with tempfile.TemporaryDirectory() as tmp:
+            write_pipeline_inputs(tmp, *shape)
+            with working_directory(tmp):
+                for streaming in (False, True):
+                    with quiet(), Measure() as m:
+                        preprocess_data.preprocess_data(streaming=streaming, memory_limit_mb=memory_limit_mb)
+                    record(results, f"preprocess/{'streaming' if streaming else 'in_memory'}", scale, m,
+                           shape='x'.join(map(str, shape)))
+
+
+def bench_dashboard(results, scales):
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+    import cluster_data
+    import preprocess_data
+    script = os.path.join(ROOT, 'src', 'dashboard.py')
+    for scale in scales:
+        shape = SCALES[scale]
+        with tempfile.TemporaryDirectory() as tmp:
+            write_pipeline_inputs(tmp, *shape)
+            with working_directory(tmp):
+                with quiet():
+                    preprocess_data.preprocess_data()
+                    cluster_data.main(k=3)
+                st.cache_resource.clear()
+                st.cache_data.clear()
+                at = AppTest.from_file(script, default_timeout=600)
+                with quiet(), Measure() as m:
+                    at.run()
+                assert not at.exception, at.exception
+                record(results, 'dashboard/first_run', scale, m, shape='x'.join(map(str, shape)))
+                with quiet(), Measure() as m:
+                    at.sidebar.multiselect[0].set_value(country_names(shape[0]))
+                    at.run()
+                record(results, 'dashboard/select_all', scale, m, countries=shape[0])
+                with quiet(), Measure() as m:
+                    at.sidebar.selectbox[0].set_value('Dark')
+                    at.run()
+                record(results, 'dashboard/theme_rerun', scale, m)
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--scales', nargs='+', default=list(SCALES), choices=list(SCALES))
+    parser.add_argument('--latency', type=float, default=0.05, help='mock server latency in seconds')
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--fixtures', help='directory of recorded <Country>.html pages')
+    parser.add_argument('--memory-limit-mb', type=float, default=256)
+    parser.add_argument('--only', nargs='+', choices=['fetch', 'scrape', 'preprocess', 'dashboard'])
+    args = parser.parse_args()
+
+    suites = {
+        'fetch': lambda r: bench_fetch(r, args.latency, args.workers),
+        'scrape': lambda r: bench_scrape(r, args.fixtures),
+        'preprocess': lambda r: bench_preprocess(r, args.scales, args.memory_limit_mb),
+        'dashboard': lambda r: bench_dashboard(r, args.scales),
+    }
+    results = []
+    for name, suite in suites.items():
+        if args.only is None or name in args.only:
+            suite(results)
+
+    report = {
+        'meta': {
+            'commit': git_commit(), 'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(), 'platform': platform.platform(),
+            'pandas': pd.__version__, 'args': vars(args),
+        },
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
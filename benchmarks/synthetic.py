@@ -0,0 +1,98 @@
+"""Synthetic country x year x indicator panels shaped like the pipeline's data files."""
+import csv
+import io
+import os
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+from country_registry import load_registry
+
+WB_BASE_COLUMNS = [
+    'GDP_Current_USD', 'GDP_Per_Capita_USD', 'Inflation_Rate_WB', 'Unemployment_Rate_WB',
+    'GDP_Per_Capita_Growth', 'Exports_WB', 'Imports_WB', 'Gini_Coefficient_WB', 'Population_WB',
+]
+
+# (countries, years, indicators); indicators beyond the nine real ones are synthetic
+SCALES = {
+    'current': (50, 9, 9),
+    'medium': (250, 60, 100),
+    'large': (250, 60, 1000),
+}
+
+
+def country_names(n):
+    """The real country names first, then numbered synthetic economies."""
+    names = list(load_registry().names)
+    return (names + [f"Economy {i:03d}" for i in range(max(0, n - len(names)))])[:n]
+
+
+def worldbank_panel(countries, years, indicators, last_year=2023, missing=0.1, seed=0):
+    """A worldbank_data.csv-shaped frame: Country, date and one column per indicator."""
+    rng = np.random.default_rng(seed)
+    names = country_names(countries)
+    columns = WB_BASE_COLUMNS[:indicators] + [f"Indicator_{i:04d}" for i in range(max(0, indicators - 9))]
+    values = rng.lognormal(mean=3, sigma=1.5, size=(countries * years, len(columns)))
+    values[rng.random(values.shape) < missing] = np.nan
+    df = pd.DataFrame(values, columns=columns)
+    df.insert(0, 'Country', np.repeat(names, years))
+    df.insert(1, 'date', np.tile(np.arange(last_year - years + 1, last_year + 1), countries))
+    return df
+
+
+def wiki_frame(countries, year=2023, seed=0):
+    """A raw_economic_data.csv-shaped frame with one row per country."""
+    rng = np.random.default_rng(seed)
+    n = countries
+    return pd.DataFrame({
+        'Country': country_names(n), 'Year': year, 'Currency': 'USD',
+        'Population': rng.lognormal(16, 1.5, n), 'GDP_Growth': rng.normal(2, 3, n),
+        'GDP_Per_Capita': rng.lognormal(9, 1, n), 'Inflation_Rate': rng.uniform(0, 40, n),
+        'Gini_Coefficient': rng.uniform(24, 63, n), 'Labor_Force': rng.lognormal(15, 1.5, n),
+        'Unemployment_Rate': rng.uniform(1, 30, n), 'Main_Sectors': 'Services, manufacturing',
+        'Foreign_Reserves': rng.lognormal(23, 2, n),
+    })
+
+
+def write_pipeline_inputs(directory, countries, years, indicators, seed=0):
+    """Write data/raw_economic_data.csv and data/worldbank_data.csv under directory."""
+    os.makedirs(os.path.join(directory, 'data'), exist_ok=True)
+    wiki_frame(countries, seed=seed).to_csv(os.path.join(directory, 'data', 'raw_economic_data.csv'), index=False)
+    worldbank_panel(countries, years, indicators, seed=seed).to_csv(
+        os.path.join(directory, 'data', 'worldbank_data.csv'), index=False)
+
+
+def write_wdi_zip(path, countries, indicators, first_year=1960, last_year=2023, missing=0.3, seed=0):
+    """Write a ZIP shaped like the WDI bulk download (WDI_CSV.zip).
+
+    WDICSV.csv has one row per economy and indicator code with a column per
+    year; WDICountry.csv lists the economies, with the aggregates WLD and EUU
+    (no region) appended. countries are ISO3 codes; indicators are codes, or
+    an int for that many synthetic ones. Returns the indicator codes.
+    """
+    if isinstance(indicators, int):
+        indicators = [f"SYN.IND.{i:05d}" for i in range(indicators)]
+    rng = np.random.default_rng(seed)
+    years = [str(year) for year in range(first_year, last_year + 1)]
+    registry = load_registry()
+    economies = [(code, registry.name(code) or code) for code in countries]
+    aggregates = [('WLD', 'World'), ('EUU', 'European Union')]
+    with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        with archive.open('WDICSV.csv', 'w') as raw, io.TextIOWrapper(raw, encoding='utf-8-sig', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['Country Name', 'Country Code', 'Indicator Name', 'Indicator Code', *years])
+            for code, name in economies + aggregates:
+                values = rng.lognormal(mean=3, sigma=1.5, size=(len(indicators), len(years))).round(4)
+                blank = rng.random(values.shape) < missing
+                for indicator, row, row_blank in zip(indicators, values, blank):
+                    writer.writerow([name, code, f"{indicator} (synthetic)", indicator,
+                                     *('' if b else repr(v) for v, b in zip(row.tolist(), row_blank))])
+        with archive.open('WDICountry.csv', 'w') as raw, io.TextIOWrapper(raw, encoding='utf-8-sig', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['Country Code', 'Short Name', 'Table Name', 'Region', 'Income Group'])
+            for code, name in economies:
+                writer.writerow([code, name, name, 'Synthetic region', 'High income'])
+            for code, name in aggregates:
+                writer.writerow([code, name, name, '', ''])
+    return indicators
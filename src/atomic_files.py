@@ -0,0 +1,17 @@
+import contextlib
+import os
+import uuid
+
+@contextlib.contextmanager
+def atomic_path(path):
+    """Yield a temporary path to write to; it replaces path only if the block succeeds.
+
+    Readers of path see the old file or the new one, never a partial write.
+    """
+    tmp = f"{path}.tmp-{uuid.uuid4().hex}"
+    try:
+        yield tmp
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
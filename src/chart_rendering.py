@@ -0,0 +1,106 @@
+from functools import lru_cache
+
+import numpy as np
+import plotly.express as px
+
+from country_registry import load_registry
+
+# Above this many points a chart switches to large-panel mode: WebGL traces
+# and per-series downsampling to roughly this many points in total
+LARGE_PANEL_POINTS = 5000
+MIN_POINTS_PER_SERIES = 20
+
+def lttb(x, y, n_out):
+    """Largest-Triangle-Three-Buckets downsampling; returns indices of kept points.
+
+    Keeps the first and last points and, from each bucket in between, the
+    point forming the largest triangle with the previously kept point and
+    the average of the next bucket, which preserves peaks and troughs.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    kept = np.empty(n_out, dtype=int)
+    kept[0], kept[-1] = 0, n - 1
+    previous = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        next_start, next_stop = stop, edges[i + 2] if i + 2 < len(edges) else n
+        next_x = x[next_start:next_stop].mean()
+        next_y = y[next_start:next_stop].mean()
+        areas = np.abs((x[previous] - next_x) * (y[start:stop] - y[previous])
+                       - (x[previous] - x[start:stop]) * (next_y - y[previous]))
+        previous = start + int(np.argmax(areas))
+        kept[i + 1] = previous
+    return kept
+
+def downsample_series(df, x, y, group, max_points=LARGE_PANEL_POINTS):
+    """Downsample each group's (x, y) series with LTTB so the total stays near max_points."""
+    if len(df) <= max_points:
+        return df
+    groups = df.groupby(group, sort=False, observed=True).indices
+    per_series = max(MIN_POINTS_PER_SERIES, max_points // max(1, len(groups)))
+    # Whole columns converted once, then indexed per group
+    xs, ys = df[x].to_numpy(), df[y].to_numpy()
+    present = df[y].notna().to_numpy()
+    keep = []
+    for rows in groups.values():
+        rows = rows[np.argsort(xs[rows], kind='stable')]
+        valid = rows[present[rows]]
+        keep.append(valid[lttb(xs[valid], ys[valid], per_series)])
+    return df.iloc[np.sort(np.concatenate(keep))] if keep else df.iloc[:0]
+
+def is_large(df, large=None):
+    return len(df) > LARGE_PANEL_POINTS if large is None else large
+
+@lru_cache(maxsize=256)
+def iso3_locations(countries):
+    """ISO-3 codes for a tuple of country names, or None if any is unknown.
+
+    plotly.js matches 'country names' locations with a regex per country on
+    the client; ISO-3 codes are a direct lookup into its geometry.
+    """
+    registry = load_registry()
+    codes = tuple(registry.iso3_code(country) for country in countries)
+    return None if None in codes else codes
+
+def trend_figure(filtered_ts, large=None):
+    if is_large(filtered_ts, large):
+        # Splines are SVG-only; WebGL traces draw straight segments
+        data = downsample_series(filtered_ts, 'Year', 'GDP_Per_Capita_Growth', 'Country')
+        fig = px.line(data, x='Year', y='GDP_Per_Capita_Growth', color='Country',
+                      title="GDP Per Capita Growth", render_mode='webgl')
+    else:
+        fig = px.line(filtered_ts, x='Year', y='GDP_Per_Capita_Growth', color='Country',
+                      title="GDP Per Capita Growth", line_shape='spline')
+    fig.update_layout(showlegend=True, plot_bgcolor="rgba(0,0,0,0)")
+    return fig
+
+def cluster_figure(filtered_static, large=None):
+    fig = px.scatter(filtered_static, x='GDP_Per_Capita_Calc', y='Gini_Coefficient',
+                     color='Cluster', size='Population_WB', hover_data=['Country', 'Unemployment_Rate'],
+                     title="Economic Clustering", opacity=0.8,
+                     render_mode='webgl' if is_large(filtered_static, large) else 'auto')
+    fig.update_layout(showlegend=True, plot_bgcolor="rgba(0,0,0,0)")
+    return fig
+
+def gini_map_figure(filtered_static, large=None):
+    locations = None
+    if is_large(filtered_static, large):
+        if 'ISO3' in filtered_static and filtered_static['ISO3'].notna().all():
+            locations = tuple(filtered_static['ISO3'].astype(str))
+        else:
+            locations = iso3_locations(tuple(filtered_static['Country']))
+    if locations is None:
+        fig = px.choropleth(filtered_static, locations='Country', locationmode='country names',
+                            color='Gini_Coefficient', hover_data=['Country', 'GDP_Per_Capita_Calc'],
+                            title="Gini Coefficient", color_continuous_scale='Viridis')
+    else:
+        fig = px.choropleth(filtered_static.assign(ISO3=locations), locations='ISO3', locationmode='ISO-3',
+                            color='Gini_Coefficient', hover_data=['Country', 'GDP_Per_Capita_Calc'],
+                            title="Gini Coefficient", color_continuous_scale='Viridis')
+    fig.update_layout(geo=dict(showframe=False, projection_type='equirectangular'))
+    return fig
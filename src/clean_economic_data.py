@@ -0,0 +1,129 @@
+import argparse
+import pandas as pd
+import re
+import metrics
+from column_store import save_frame
+
+# Infobox header classifier: first matching rule wins. Each rule lists
+# alternative groups of substrings that must all appear in the lower-cased
+# header, and the kind of value the field holds.
+HEADER_RULES = [
+    ('GDP_Nominal', 'amount', [('gdp', 'nominal')]),
+    ('GDP_PPP', 'amount', [('gdp (ppp)',)]),
+    ('GDP_Growth', 'percent', [('gdp growth',)]),
+    ('GDP_Per_Capita', 'amount', [('gdp per capita',)]),
+    ('Inflation_Rate', 'percent', [('inflation',)]),
+    ('Unemployment_Rate', 'percent', [('unemployment',)]),
+    # Before 'population' so "Population below poverty line" is not read as population
+    ('Poverty_Rate', 'percent', [('poverty',)]),
+    ('Population', 'amount', [('population',)]),
+    ('Gini_Coefficient', 'percent', [('gini',)]),
+    ('HDI', 'amount', [('hdi',)]),
+    ('Debt_to_GDP', 'percent', [('debt', 'gdp')]),
+    ('Trade_Balance', 'amount', [('trade balance',)]),
+    ('Currency', 'currency', [('currency',)]),
+    ('Foreign_Reserves', 'amount', [('reserves',)]),
+    ('Labor_Force', 'amount', [('labor force',)]),
+    ('Exports', 'amount', [('exports', 'goods')]),
+    ('Imports', 'amount', [('imports', 'goods')]),
+    ('Main_Sectors', 'text', [('main industries',), ('sectors',)]),
+]
+
+FIELD_KINDS = {field: kind for field, kind, _ in HEADER_RULES}
+
+SCALES = {
+    'trillion': 1e12, 'tn': 1e12, 'billion': 1e9, 'bn': 1e9,
+    'million': 1e6, 'mn': 1e6, 'thousand': 1e3,
+}
+
+# Footnote markers such as [12], [a] or [note 3]
+FOOTNOTES = r'\[[^\]]*\]'
+# First number in the cell, with optional sign and a scale word right after it
+NUMBER = (r'(?P<sign>[-−–])?\s*[$€£¥]?\s*(?P<number>\d[\d,]*(?:\.\d+)?)'
+          r'\s*(?P<scale>trillion|billion|million|thousand|tn|bn|mn)?\b')
+
+def classify_header(header_text):
+    """Map a lower-cased infobox header to a field name, or None."""
+    for field, _, alternatives in HEADER_RULES:
+        if any(all(term in header_text for term in terms) for terms in alternatives):
+            return field
+    return None
+
+def parse_numbers(values, scaled):
+    """Vectorized extraction of the first number in each cell.
+
+    With scaled=True the number is multiplied by a trailing scale word
+    ('$2.5 trillion' -> 2.5e12); otherwise the scale is ignored ('5.2%' -> 5.2).
+    """
+    parts = values.str.extract(NUMBER, flags=re.IGNORECASE)
+    numbers = pd.to_numeric(parts['number'].str.replace(',', '', regex=False), errors='coerce')
+    numbers = numbers.where(parts['sign'].isna(), -numbers)
+    if scaled:
+        numbers = numbers * parts['scale'].str.lower().map(SCALES).fillna(1.0)
+    return numbers
+
+def parse_currency(values):
+    """Currency code in parentheses, else the first word ('US Dollar (USD)' -> 'USD')."""
+    code = values.str.extract(r'\((.*?)\)', expand=False)
+    return code.fillna(values.str.extract(r'(\w+)', expand=False))
+
+def clean_infobox_data(df_raw):
+    """Turn raw (Country, Year, Header, Value) infobox rows into one row per country.
+
+    Headers are classified once per distinct header, then each field kind is
+    parsed column-wise. When several rows map to the same field the last one
+    wins, as in the original row-by-row scraper.
+    """
+    headers = df_raw['Header'].fillna('').str.strip().str.lower()
+    unique_headers = headers.unique()
+    fields = headers.map(dict(zip(unique_headers, map(classify_header, unique_headers))))
+    
+    rows = df_raw.assign(Field=fields).dropna(subset=['Field'])
+    rows = rows.drop_duplicates(['Country', 'Year', 'Field'], keep='last')
+    values = rows['Value'].fillna('').astype(str).str.replace(FOOTNOTES, '', regex=True).str.strip()
+    kinds = rows['Field'].map(FIELD_KINDS)
+    
+    cleaned = pd.Series(None, index=rows.index, dtype=object)
+    for kind, mask in kinds.groupby(kinds).groups.items():
+        subset = values.loc[mask]
+        if kind == 'amount':
+            cleaned.loc[mask] = parse_numbers(subset, scaled=True)
+        elif kind == 'percent':
+            cleaned.loc[mask] = parse_numbers(subset, scaled=False)
+        elif kind == 'currency':
+            cleaned.loc[mask] = parse_currency(subset)
+        else:
+            cleaned.loc[mask] = subset.where(subset != '')
+    
+    # Wide frame in first-seen order of countries and fields
+    wide = rows.assign(Clean=cleaned).pivot(index=['Country', 'Year'], columns='Field', values='Clean')
+    country_order = df_raw[['Country', 'Year']].drop_duplicates()
+    wide = wide.reindex(pd.MultiIndex.from_frame(country_order))
+    wide = wide[[field for field in pd.unique(rows['Field'])]]
+    for field in wide.columns:
+        if FIELD_KINDS[field] in ('amount', 'percent'):
+            wide[field] = pd.to_numeric(wide[field])
+    wide.columns.name = None
+    return wide.reset_index()
+
+def main(raw_path='data/raw_infobox_data.csv', output_path='data/raw_economic_data.csv'):
+    try:
+        df_raw = pd.read_csv(raw_path, dtype={'Header': str, 'Value': str})
+    except FileNotFoundError:
+        print(f"Error: {raw_path} not found. Run scrape_economic_data.py first.")
+        return
+    
+    with metrics.stage('clean_infobox') as stage:
+        stage.rows_in = len(df_raw)
+        df = clean_infobox_data(df_raw)
+        save_frame(df, output_path)
+        stage.rows_out = len(df)
+    metrics.log(f"Cleaned data saved to {output_path}")
+    metrics.log(f"Dataset size: {df.shape[0]} countries, {df.shape[1]} columns")
+    return df
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Clean raw infobox rows into one row per country")
+    metrics.add_arguments(parser)
+    metrics.configure_from_args(parser.parse_args())
+    main()
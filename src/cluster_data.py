@@ -0,0 +1,168 @@
+import argparse
+import os
+import joblib
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.metrics import silhouette_score
+from sklearn.preprocessing import StandardScaler
+import metrics
+from atomic_files import atomic_path
+from column_store import load_frame, save_frame
+
+FEATURES = ('GDP_Per_Capita_Calc', 'Gini_Coefficient')
+MODEL_PATH = 'models/cluster_model.joblib'
+# The same features in the time series, where the Gini coefficient comes from the World Bank
+TS_FEATURES = ('GDP_Per_Capita_Calc', 'Gini_Coefficient_WB')
+TS_PATH = 'data/processed_worldbank_data.csv'
+
+# Above this many rows, fit with MiniBatchKMeans and score on a sample
+MINIBATCH_ROWS = 10000
+SILHOUETTE_SAMPLE = 5000
+
+def _fit_k(X, k, random_state):
+    """Fit one candidate k and score it; runs inside a joblib worker."""
+    if len(X) > MINIBATCH_ROWS:
+        model = MiniBatchKMeans(n_clusters=k, random_state=random_state, n_init=3, batch_size=4096)
+    else:
+        model = KMeans(n_clusters=k, random_state=random_state, n_init=10)
+    labels = model.fit_predict(X)
+    sample = min(len(X), SILHOUETTE_SAMPLE)
+    score = silhouette_score(X, labels, sample_size=sample, random_state=random_state)
+    return k, model, score
+
+def _relabel(model, scaler):
+    """Order cluster ids by the centroid of the first feature, so labels are stable across refits."""
+    order = np.argsort(scaler.inverse_transform(model.cluster_centers_)[:, 0])
+    model.cluster_centers_ = model.cluster_centers_[order]
+    if hasattr(model, 'labels_'):
+        model.labels_ = np.argsort(order)[model.labels_]
+    return model
+
+def fit_clusters(df, features=FEATURES, k_values=range(2, 9), n_jobs=-1, random_state=42):
+    """Scale the features, fit every candidate k in parallel and keep the best silhouette.
+
+    Returns a model dict with the scaler, fitted estimator, chosen k and the
+    score of every candidate.
+    """
+    X_raw = df[list(features)].dropna().to_numpy()
+    k_values = [k for k in k_values if 2 <= k < len(X_raw)]
+    if not k_values:
+        raise ValueError(f"Need more than 2 complete rows to cluster, got {len(X_raw)}")
+    scaler = StandardScaler().fit(X_raw)
+    X = scaler.transform(X_raw)
+    
+    results = Parallel(n_jobs=n_jobs, prefer='threads')(
+        delayed(_fit_k)(X, k, random_state) for k in k_values)
+    k, model, _ = max(results, key=lambda result: result[2])
+    return {
+        'features': list(features),
+        'scaler': scaler,
+        'model': _relabel(model, scaler),
+        'k': k,
+        'scores': {k: score for k, _, score in results},
+    }
+
+def assign_clusters(df, model):
+    """Label rows with their nearest centroid, without refitting. Rows with missing features get NaN."""
+    X = df[model['features']].dropna()
+    labels = pd.Series(np.nan, index=df.index)
+    if len(X):
+        scaled = model['scaler'].transform(X.to_numpy())
+        distances = ((scaled[:, None, :] - model['model'].cluster_centers_[None, :, :]) ** 2).sum(axis=2)
+        labels.loc[X.index] = distances.argmin(axis=1)
+    return labels
+
+def cluster_by_year(df_ts, features, k=None, k_values=range(2, 9), n_jobs=-1, random_state=42):
+    """Cluster every year of a (Country, Year) panel in one batched call.
+
+    Each year is fitted independently and in parallel, with a fixed k or
+    the best k per year. Returns a Series of labels aligned with df_ts.
+    """
+    years = [year for year, _ in df_ts.groupby('Year')]
+    candidates = [k] if k is not None else k_values
+    
+    def fit_year(year):
+        rows = df_ts[df_ts['Year'] == year]
+        try:
+            model = fit_clusters(rows, features, candidates, n_jobs=1, random_state=random_state)
+        except ValueError:
+            return year, None
+        return year, assign_clusters(rows, model)
+    
+    fitted = Parallel(n_jobs=n_jobs, prefer='threads')(delayed(fit_year)(year) for year in years)
+    labels = pd.Series(np.nan, index=df_ts.index)
+    for _, year_labels in fitted:
+        if year_labels is not None:
+            labels.loc[year_labels.index] = year_labels
+    return labels
+
+def save_model(model, path=MODEL_PATH):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with atomic_path(path) as tmp:
+        joblib.dump(model, tmp)
+
+def load_model(path=MODEL_PATH):
+    return joblib.load(path)
+
+def main(path='data/processed_economic_data.csv', k=None, assign_only=False, model_path=MODEL_PATH):
+    try:
+        df_static = load_frame(path)
+    except FileNotFoundError:
+        print(f"Error: {path} not found. Run preprocess_data.py first.")
+        return
+    df_static = df_static.drop(columns=['Cluster'], errors='ignore')
+    
+    with metrics.stage('cluster') as stage:
+        stage.rows_in = len(df_static)
+        if assign_only and os.path.exists(model_path):
+            # New or updated countries go to their nearest existing centroid
+            model = load_model(model_path)
+            metrics.log(f"Assigning clusters with saved model (k={model['k']})")
+        else:
+            model = fit_clusters(df_static, k_values=[k] if k else range(2, 9))
+            save_model(model, model_path)
+            scores = ', '.join(f"k={k}: {score:.3f}" for k, score in model['scores'].items())
+            metrics.log(f"Chose k={model['k']} by silhouette ({scores}); model saved to {model_path}")
+        
+        labels = assign_clusters(df_static, model)
+        df_static['Cluster'] = labels.astype(int) if labels.notna().all() else labels
+        save_frame(df_static, path)
+        stage.rows_out = int(labels.notna().sum())
+        stage.set(k=model['k'], refit=not assign_only)
+    metrics.log(f"Cluster labels saved to {path}")
+
+def main_by_year(path=TS_PATH, k=None, features=TS_FEATURES):
+    """Label every row of the time series with the clusters fitted for its year."""
+    try:
+        df_ts = load_frame(path)
+    except FileNotFoundError:
+        print(f"Error: {path} not found. Run preprocess_data.py first.")
+        return
+    df_ts = df_ts.drop(columns=['Cluster'], errors='ignore')
+    
+    with metrics.stage('cluster_by_year') as stage:
+        stage.rows_in = len(df_ts)
+        labels = cluster_by_year(df_ts, features, k)
+        df_ts['Cluster'] = labels
+        save_frame(df_ts, path)
+        stage.rows_out = int(labels.notna().sum())
+        stage.set(years=int(df_ts.loc[labels.notna(), 'Year'].nunique()))
+    metrics.log(f"Per-year cluster labels saved to {path}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cluster countries by GDP per capita and Gini coefficient")
+    parser.add_argument('--k', type=int, help="fixed number of clusters instead of choosing by silhouette")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--assign-only', action='store_true',
+                      help="label countries with the saved model instead of refitting")
+    mode.add_argument('--by-year', action='store_true',
+                      help=f"cluster each year of {TS_PATH} separately and label its rows")
+    metrics.add_arguments(parser)
+    args = parser.parse_args()
+    metrics.configure_from_args(args)
+    if args.by_year:
+        main_by_year(k=args.k)
+    else:
+        main(k=args.k, assign_only=args.assign_only)
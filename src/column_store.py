@@ -0,0 +1,172 @@
+import json
+import os
+import shutil
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from atomic_files import atomic_path
+
+# Tables are stored next to their CSV as <name>.cols/: one raw little-endian
+# binary file per column plus schema.json. Numeric columns are memory-mapped
+# straight into pandas; string columns are dictionary-encoded as int32 codes.
+STORE_SUFFIX = '.cols'
+SCHEMA_FILE = 'schema.json'
+FORMAT_VERSION = 1
+
+YEAR_COLUMNS = ('Year', 'date')
+
+def store_path(csv_path):
+    """'data/x.csv' -> 'data/x.cols'."""
+    return os.path.splitext(csv_path)[0] + STORE_SUFFIX
+
+def infer_schema(df):
+    """Explicit per-column schema: category for strings, int16 years, float64 indicators."""
+    schema = []
+    for name, dtype in df.dtypes.items():
+        # Years are numeric whatever their dtype, so an empty (object) frame still reads back as numbers
+        if name in YEAR_COLUMNS:
+            schema.append({'name': name, 'kind': 'numeric', 'dtype': '<f8' if df[name].isna().any() else '<i2'})
+        elif isinstance(dtype, pd.CategoricalDtype) or dtype == object or pd.api.types.is_string_dtype(dtype):
+            schema.append({'name': name, 'kind': 'category', 'dtype': '<i4'})
+        elif pd.api.types.is_bool_dtype(dtype):
+            schema.append({'name': name, 'kind': 'numeric', 'dtype': '|b1'})
+        else:
+            schema.append({'name': name, 'kind': 'numeric', 'dtype': '<f8'})
+    return schema
+
+class TableWriter:
+    """Append DataFrame chunks to a column store, published on close().
+
+    Columns are written to a temporary directory that replaces the target
+    only once complete, so readers see either the old or the new table.
+    """
+
+    def __init__(self, path, schema=None):
+        self.path = path
+        self.tmp_path = f"{path}.tmp-{uuid.uuid4().hex}"
+        self.schema = schema
+        self.rows = 0
+        self.opened = False
+        self.files = {}
+        self.categories = {}
+
+    def _open(self, df):
+        if self.schema is None:
+            self.schema = infer_schema(df)
+        os.makedirs(self.tmp_path)
+        self.opened = True
+        for column in self.schema:
+            self.files[column['name']] = open(os.path.join(self.tmp_path, f"{column['name']}.bin"), 'wb')
+            if column['kind'] == 'category':
+                self.categories[column['name']] = {}
+
+    def append(self, df):
+        if not self.opened:
+            self._open(df)
+        for column in self.schema:
+            name = column['name']
+            values = df[name]
+            if column['kind'] == 'category':
+                mapping = self.categories[name]
+                local_codes, uniques = pd.factorize(values)
+                # Trailing -1 makes the NaN sentinel (-1) map to -1
+                lookup = np.array([mapping.setdefault(str(u), len(mapping)) for u in uniques] + [-1], dtype='<i4')
+                codes = lookup[local_codes]
+                codes.tofile(self.files[name])
+            else:
+                np.ascontiguousarray(values.to_numpy(dtype=column['dtype'])).tofile(self.files[name])
+        self.rows += len(df)
+
+    def close(self):
+        if not self.opened:
+            self._open(pd.DataFrame(columns=[c['name'] for c in self.schema or []]))
+        for f in self.files.values():
+            f.close()
+        schema = []
+        for column in self.schema:
+            column = dict(column)
+            if column['kind'] == 'category':
+                column['categories'] = list(self.categories[column['name']])
+            schema.append(column)
+        with open(os.path.join(self.tmp_path, SCHEMA_FILE), 'w') as f:
+            json.dump({'version': FORMAT_VERSION, 'rows': self.rows, 'columns': schema}, f)
+        # Swap the finished table in; the old one is removed afterwards
+        old_path = None
+        if os.path.exists(self.path):
+            old_path = f"{self.path}.old-{uuid.uuid4().hex}"
+            os.replace(self.path, old_path)
+        os.replace(self.tmp_path, self.path)
+        if old_path:
+            shutil.rmtree(old_path, ignore_errors=True)
+
+    def abort(self):
+        for f in self.files.values():
+            f.close()
+        shutil.rmtree(self.tmp_path, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+def write_table(df, path, schema=None):
+    with TableWriter(path, schema) as writer:
+        writer.append(df)
+
+def read_schema(path):
+    with open(os.path.join(path, SCHEMA_FILE)) as f:
+        return json.load(f)
+
+def _column(path, column, rows, start=0, stop=None, mmap=True):
+    stop = rows if stop is None else stop
+    dtype = np.dtype(column['dtype'])
+    file = os.path.join(path, f"{column['name']}.bin")
+    if rows == 0 or stop <= start:
+        values = np.empty(0, dtype=dtype)
+    elif mmap:
+        # Copy-on-write mapping: pages load lazily and writes never reach disk
+        values = np.memmap(file, dtype=dtype, mode='c', offset=start * dtype.itemsize, shape=(stop - start,))
+    else:
+        values = np.fromfile(file, dtype=dtype, offset=start * dtype.itemsize, count=stop - start)
+    if column['kind'] == 'category':
+        return pd.Categorical.from_codes(values, categories=column['categories'])
+    return values
+
+def read_table(path, columns=None, mmap=True, start=0, stop=None):
+    """Load a table (or a row range of it), projecting to the requested columns."""
+    meta = read_schema(path)
+    wanted = meta['columns'] if columns is None else \
+        [c for c in meta['columns'] if c['name'] in set(columns)]
+    if columns is not None:
+        missing = set(columns) - {c['name'] for c in wanted}
+        if missing:
+            raise KeyError(f"Columns not in {path}: {sorted(missing)}")
+    data = {c['name']: _column(path, c, meta['rows'], start, stop, mmap) for c in wanted}
+    return pd.DataFrame(data, copy=False)
+
+def iter_table(path, chunk_rows, columns=None):
+    """Yield the table in row chunks of at most chunk_rows."""
+    rows = read_schema(path)['rows']
+    for start in range(0, rows, chunk_rows):
+        yield read_table(path, columns, start=start, stop=min(start + chunk_rows, rows))
+
+def load_frame(csv_path, columns=None):
+    """Read a pipeline table from its column store, falling back to the CSV."""
+    path = store_path(csv_path)
+    if os.path.exists(os.path.join(path, SCHEMA_FILE)):
+        return read_table(path, columns)
+    return pd.read_csv(csv_path, usecols=columns)
+
+def save_frame(df, csv_path, csv=True):
+    """Write a pipeline table to its column store and, for export, to CSV."""
+    os.makedirs(os.path.dirname(csv_path) or '.', exist_ok=True)
+    write_table(df, store_path(csv_path))
+    if csv:
+        with atomic_path(csv_path) as tmp:
+            df.to_csv(tmp, index=False)
@@ -0,0 +1,11 @@
+# List of 50 countries (G20 + others for diversity)
+countries = [
+    'United_States', 'China', 'India', 'Germany', 'Brazil', 'Japan', 'United_Kingdom',
+    'France', 'Canada', 'Australia', 'Russia', 'South_Korea', 'Mexico', 'Indonesia',
+    'Nigeria', 'South_Africa', 'Argentina', 'Saudi_Arabia', 'Italy', 'Spain',
+    'Turkey', 'Netherlands', 'Switzerland', 'Sweden', 'Belgium', 'Poland', 'Thailand',
+    'Malaysia', 'Philippines', 'Vietnam', 'Singapore', 'Egypt', 'Algeria', 'Morocco',
+    'Kenya', 'Ethiopia', 'Ghana', 'Pakistan', 'Bangladesh', 'Iran', 'United_Arab_Emirates',
+    'Qatar', 'Chile', 'Colombia', 'Peru', 'New_Zealand', 'Norway', 'Denmark', 'Finland',
+    'Ireland'
+]
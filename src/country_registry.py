@@ -0,0 +1,185 @@
+import argparse
+import os
+import re
+import unicodedata
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import requests
+
+import metrics
+from atomic_files import atomic_path
+
+REGISTRY_PATH = 'data/country_registry.csv'
+# The copy shipped with the repository, used when the working directory has none
+BUNDLED_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', REGISTRY_PATH)
+WB_COUNTRY_URL = "https://api.worldbank.org/v2/country"
+REGISTRY_COLUMNS = ['key', 'iso3', 'iso2', 'name', 'wb_name', 'wiki_slug', 'region', 'income_level',
+                    'aggregate', 'aliases']
+
+# Short names used across the project (and by Wikipedia) for economies whose
+# World Bank name differs; the World Bank name is kept as an alias
+NAME_OVERRIDES = {
+    'BHS': 'The Bahamas', 'BRN': 'Brunei', 'COD': 'Democratic Republic of the Congo',
+    'COG': 'Republic of the Congo', 'CZE': 'Czech Republic', 'EGY': 'Egypt', 'FSM': 'Micronesia',
+    'GMB': 'The Gambia', 'HKG': 'Hong Kong', 'IRN': 'Iran', 'KGZ': 'Kyrgyzstan', 'KNA': 'Saint Kitts and Nevis',
+    'KOR': 'South Korea', 'LAO': 'Laos', 'LCA': 'Saint Lucia', 'MAC': 'Macau', 'PRK': 'North Korea',
+    'RUS': 'Russia', 'SVK': 'Slovakia', 'SYR': 'Syria', 'TUR': 'Turkey', 'VCT': 'Saint Vincent and the Grenadines',
+    'VEN': 'Venezuela', 'VNM': 'Vietnam', 'YEM': 'Yemen', 'PSE': 'Palestine', 'CIV': 'Ivory Coast',
+    'CPV': 'Cape Verde', 'STP': 'Sao Tome and Principe', 'TLS': 'East Timor', 'SWZ': 'Eswatini',
+}
+
+def normalize(name):
+    """Lookup form of a country name: ASCII, lower case, no punctuation, no leading 'the'."""
+    name = unicodedata.normalize('NFKD', str(name)).encode('ascii', 'ignore').decode()
+    name = re.sub(r"[^\w\s]", '', name.casefold().replace('_', ' ').replace('-', ' '))
+    name = re.sub(r'\s+', ' ', name).strip()
+    return name[4:] if name.startswith('the ') else name
+
+class CountryRegistry:
+    """Canonical countries with stable integer keys, ISO codes, aliases and Wikipedia slugs.
+
+    The key of a country is its row in the registry; iso3_categorical() turns
+    names or codes into a Categorical whose codes are those keys, so stages
+    join on small integers instead of strings.
+    """
+
+    def __init__(self, df):
+        df = df.sort_values('key', ignore_index=True)
+        self.df = df
+        self.iso3 = df['iso3'].tolist()
+        self.names = df['name'].tolist()
+        self.dtype = pd.CategoricalDtype(self.iso3)
+        self.reported = set()
+        self.lookup = {}
+        for key, row in enumerate(df.itertuples(index=False)):
+            aliases = row.aliases.split('|') if isinstance(row.aliases, str) and row.aliases else []
+            for label in [row.iso3, row.iso2, row.name, row.wb_name, row.wiki_slug, *aliases]:
+                if isinstance(label, str) and label:
+                    self.lookup.setdefault(normalize(label), key)
+
+    @classmethod
+    def load(cls, path=REGISTRY_PATH):
+        # Everything as text, so empty fields stay '' and Namibia's iso2 'NA' is not a missing value
+        return cls(pd.read_csv(path, dtype=str, keep_default_na=False).astype({'key': int}))
+
+    def save(self, path=REGISTRY_PATH):
+        with atomic_path(path) as tmp:
+            self.df.to_csv(tmp, index=False)
+
+    @classmethod
+    def from_worldbank(cls, client=requests, base_url=WB_COUNTRY_URL, seed=None):
+        """Build from the World Bank country metadata, keeping the seed's keys, names and slugs."""
+        response = client.get(base_url, params={'format': 'json', 'per_page': 1000}, timeout=30)
+        response.raise_for_status()
+        entries = response.json()[1]
+        rows = {row['iso3']: dict(row) for row in seed.df.to_dict('records')} if seed is not None else {}
+        next_key = max((row['key'] for row in rows.values()), default=-1) + 1
+        for entry in sorted(entries, key=lambda e: e['id']):
+            iso3, wb_name = entry['id'], entry['name'].strip()
+            row = rows.get(iso3)
+            if row is None:
+                name = NAME_OVERRIDES.get(iso3, wb_name)
+                row = rows[iso3] = {'key': next_key, 'iso3': iso3, 'name': name,
+                                    'wiki_slug': name.replace(' ', '_'), 'aliases': ''}
+                next_key += 1
+            aggregate = entry.get('region', {}).get('value') == 'Aggregates'
+            row.update(iso2=entry.get('iso2Code') or '', wb_name=wb_name,
+                       region='' if aggregate else entry.get('region', {}).get('value', ''),
+                       income_level=entry.get('incomeLevel', {}).get('value', ''), aggregate=aggregate)
+        return cls(pd.DataFrame(list(rows.values()), columns=REGISTRY_COLUMNS))
+
+    def __len__(self):
+        return len(self.iso3)
+
+    def key(self, name):
+        """Registry key for a name, alias, slug or ISO code, or None if unknown."""
+        if name is None or name != name:
+            return None
+        return self.lookup.get(normalize(name))
+
+    def resolve(self, countries):
+        """Map each resolvable name or code to (ISO3, canonical name), in input order."""
+        code_to_name = {}
+        for country in countries:
+            key = self.key(country)
+            if key is None:
+                metrics.log(f"No country code for {country}")
+                continue
+            code_to_name[self.iso3[key]] = self.names[key]
+        return code_to_name
+
+    def iso3_code(self, name):
+        key = self.key(name)
+        return None if key is None else self.iso3[key]
+
+    def name(self, name):
+        key = self.key(name)
+        return None if key is None else self.names[key]
+
+    def keys(self, values):
+        """Vectorized key(): normalizes each distinct value once; unknown values get -1."""
+        codes, uniques = pd.factorize(pd.Series(values, dtype=object))
+        lookup = np.array([-1 if (k := self.key(u)) is None else k for u in uniques] + [-1], dtype=np.int32)
+        return lookup[codes]
+
+    def iso3_categorical(self, values):
+        return pd.Categorical.from_codes(self.keys(values), dtype=self.dtype)
+
+    def canonicalize(self, df, column='Country', context='data'):
+        """Return df with canonical names in column and an ISO3 categorical key after it.
+
+        Names the registry does not know keep their spelling (underscores
+        become spaces) with a missing ISO3, and are reported once per process.
+        """
+        keys = self.keys(df[column].to_numpy())
+        known = keys >= 0
+        raw = df[column].astype(str).str.replace('_', ' ')
+        names = np.where(known, np.asarray(self.names, dtype=object)[np.maximum(keys, 0)], raw.to_numpy(dtype=object))
+        if not known.all():
+            unknown = sorted(set(pd.unique(raw[~known])) - self.reported)
+            if unknown:
+                self.reported.update(unknown)
+                print(f"Warning: {len(unknown)} unrecognized countries in {context}: {unknown[:10]}")
+        df = df.drop(columns=['ISO3'], errors='ignore').copy()
+        df[column] = names
+        df.insert(df.columns.get_loc(column) + 1, 'ISO3', pd.Categorical.from_codes(keys, dtype=self.dtype))
+        return df
+
+    def economies(self, include_aggregates=False):
+        """ISO3 codes of every economy (and regional/income aggregates if asked)."""
+        mask = np.ones(len(self), dtype=bool) if include_aggregates else \
+            ~self.df['aggregate'].astype(str).str.lower().isin(['true', '1'])
+        return [code for code, keep in zip(self.iso3, mask) if keep]
+
+    def has_metadata(self):
+        """Whether the registry was built from World Bank metadata rather than the seed list."""
+        return bool((self.df['region'].astype(str) != '').any())
+
+@lru_cache(maxsize=1)
+def load_registry(path=REGISTRY_PATH):
+    """The registry shared by every stage in this process."""
+    return CountryRegistry.load(path if os.path.exists(path) else BUNDLED_PATH)
+
+def refresh_registry(client=requests, path=REGISTRY_PATH, base_url=WB_COUNTRY_URL):
+    """Rebuild the registry from World Bank metadata and save it over the local copy."""
+    seed = CountryRegistry.load(path) if os.path.exists(path) else None
+    registry = CountryRegistry.from_worldbank(client, base_url, seed=seed)
+    registry.save(path)
+    load_registry.cache_clear()
+    metrics.log(f"Country registry: {len(registry.economies())} economies, {len(registry)} entries saved to {path}")
+    return registry
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refresh the country registry from World Bank metadata")
+    parser.add_argument('--offline', action='store_true', help="serve the metadata only from the HTTP cache")
+    metrics.add_arguments(parser)
+    args = parser.parse_args()
+    metrics.configure_from_args(args)
+    from http_cache import ResponseCache
+    from http_client import FetchExecutor
+    cache = ResponseCache(offline=args.offline)
+    with FetchExecutor(cache=cache) as executor:
+        refresh_registry(executor)
+    cache.close()
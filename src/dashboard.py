@@ -1,12 +1,25 @@
 
 import streamlit as st
-import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
+import metrics
+import snapshots
+from chart_rendering import cluster_figure, gini_map_figure, trend_figure
+from column_store import load_frame
+from panel_cube import PanelCube
 
 # Set page config for wide layout and title
 st.set_page_config(page_title="Global Economic Dashboard", layout="wide", page_icon="🌍")
 
+# Records for cache misses go to ECON_METRICS, e.g. ECON_METRICS=data/metrics.jsonl streamlit run ...
+# Configured once per process rather than on every rerun
+@st.cache_resource(show_spinner=False)
+def configure_metrics():
+    metrics.configure_from_env()
+
+configure_metrics()
+
 # Custom CSS with Tailwind CDN
 st.markdown("""
     <link href="https://cdn.jsdelivr.net/npm/tailwindcss@2.2.19/dist/tailwind.min.css" rel="stylesheet">
@@ -19,18 +32,95 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-# Load data
-@st.cache_data
-def load_data():
-    df_static = pd.read_csv('data/processed_economic_data.csv')
-    df_ts = pd.read_csv('data/processed_worldbank_data.csv')
-    return df_static, df_ts
-
-df_static, df_ts = load_data()
+# Columns the dashboard plots; only these are read from the column stores
+STATIC_COLUMNS = ['Country', 'Year', 'GDP_Current_USD', 'GDP_Per_Capita_Calc', 'Gini_Coefficient',
+                  'Unemployment_Rate', 'Population_WB', 'Cluster']
+TS_COLUMNS = ['Country', 'Year', 'GDP_Per_Capita_Growth']
+# Static indicators averaged into the KPI cards
+KPI_COLUMNS = ['GDP_Per_Capita_Calc', 'Gini_Coefficient', 'Unemployment_Rate']
+
+def load_data(version):
+    """Frames, row indexes and KPI cube of one published snapshot (data/ itself for None)."""
+    with metrics.stage('dashboard.load_data') as stage:
+        df_static = load_frame(snapshots.dataset_path('data/processed_economic_data.csv', version),
+                               columns=STATIC_COLUMNS)
+        df_ts = load_frame(snapshots.dataset_path('data/processed_worldbank_data.csv', version), columns=TS_COLUMNS)
+        stage.rows_in = len(df_static) + len(df_ts)
+        stage.set(version=version)
+        kpi_cube = PanelCube.from_frame(df_static, indicators=KPI_COLUMNS)
+        return df_static, df_ts, index_rows(df_static), index_rows(df_ts), kpi_cube
+
+# One per process, holding the memory-mapped frames of the active snapshot; a newly
+# published snapshot is loaded in the background and used from the next rerun on
+@st.cache_resource(show_spinner=False)
+def datasets():
+    return snapshots.SnapshotCache(load_data)
+
+def index_rows(df):
+    """Map each country to its row positions ordered by Year, with those Years."""
+    years = df['Year'].to_numpy()
+    index = {}
+    for country, rows in df.groupby('Country', observed=True, sort=False).indices.items():
+        rows = rows[np.argsort(years[rows], kind='stable')]
+        index[country] = (rows, years[rows])
+    return index
+
+def select_rows(index, countries, year_range=None):
+    """Row positions for the countries (and year range), in original file order."""
+    selected = []
+    for country in countries:
+        if country not in index:
+            continue
+        rows, years = index[country]
+        if year_range is not None:
+            rows = rows[np.searchsorted(years, year_range[0], 'left'):np.searchsorted(years, year_range[1], 'right')]
+        selected.append(rows)
+    return np.sort(np.concatenate(selected)) if selected else np.empty(0, dtype=np.intp)
+
+# Everything derived from a selection of one snapshot, shared across sessions and bounded
+# in size, so views of replaced snapshots age out. The theme is not part of the key, so
+# switching it reuses the cached view.
+@st.cache_resource(max_entries=64)
+def build_view(version, countries, year_range):
+    with metrics.stage('dashboard.build_view') as stage:
+        view = _build_view(version, datasets().data(version), countries, year_range)
+        stage.rows_out = len(view['table'])
+        stage.set(countries=len(countries), year_range=year_range)
+    return view
+
+def _build_view(version, data, countries, year_range):
+    df_static, df_ts, static_index, ts_index, kpi_cube = data
+    static_rows = select_rows(static_index, countries)
+    # Plain string labels so Plotly sees only the selected countries, not every category
+    filtered_static = df_static.iloc[static_rows].astype({'Country': str})
+    filtered_ts = df_ts.iloc[select_rows(ts_index, countries, year_range)].astype({'Country': str})
+    
+    # Averages over the selected countries' cells in the static year
+    year = kpi_cube.years[-1] if len(kpi_cube.years) else None
+    kpis = {key: kpi_cube.mean(column, countries, year) if year is not None else np.nan
+            for key, column in zip(['avg_gdp', 'avg_gini', 'avg_unemp'], KPI_COLUMNS)}
+    
+    fig_tree = px.treemap(filtered_static, path=['Country'], values='GDP_Current_USD',
+                          color='GDP_Per_Capita_Calc', hover_data=['Country'],
+                          color_continuous_scale='Blues', title="GDP Contribution")
+    
+    # Above LARGE_PANEL_POINTS these switch to downsampled WebGL traces
+    fig_scatter = cluster_figure(filtered_static)
+    fig_line = trend_figure(filtered_ts)
+    fig_choro = gini_map_figure(filtered_static)
+    
+    table = filtered_static[['Country', 'Year', 'GDP_Per_Capita_Calc', 'Gini_Coefficient', 'Unemployment_Rate', 'Cluster']]
+    # The download has every processed column, not just the plotted ones
+    exported = load_frame(snapshots.dataset_path('data/processed_economic_data.csv', version)).iloc[static_rows]
+    csv = exported.to_csv(index=False).encode('utf-8')
+    return {'kpis': kpis, 'fig_tree': fig_tree, 'fig_scatter': fig_scatter, 'fig_line': fig_line,
+            'fig_choro': fig_choro, 'table': table, 'csv': csv}
+
+version, (df_static, df_ts, _, _, _) = datasets().get()
 
 # Sidebar for filters
 st.sidebar.title("Filters")
-countries = st.sidebar.multiselect("Select Countries", options=df_static['Country'].unique(),
+countries = st.sidebar.multiselect("Select Countries", options=df_static['Country'].unique().tolist(),
                                   default=['United States', 'China', 'India'])
 year_range = st.sidebar.slider("Year Range (Time-Series)", min_value=2015, max_value=2023,
                                value=(2015, 2023))
@@ -47,10 +137,9 @@ if theme == "Dark":
         </style>
     """, unsafe_allow_html=True)
 
-# Filter data
-filtered_static = df_static[df_static['Country'].isin(countries)]
-filtered_ts = df_ts[(df_ts['Country'].isin(countries)) & 
-                    (df_ts['Year'].between(year_range[0], year_range[1]))]
+# Filter data via the country index and build (or reuse) the figures
+view = build_view(version, tuple(countries), tuple(year_range))
+kpis = view['kpis']
 
 # Main title
 st.markdown('<div class="header">Global Economic Dashboard</div>', unsafe_allow_html=True)
@@ -64,57 +153,38 @@ with tab1:
     # KPI Metrics
     col1, col2, col3 = st.columns(3)
     with col1:
-        avg_gdp = filtered_static['GDP_Per_Capita_Calc'].mean()
-        st.markdown(f'<div class="metric-card"><b>Avg GDP Per Capita</b><br>{avg_gdp:,.2f} USD</div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="metric-card"><b>Avg GDP Per Capita</b><br>{kpis["avg_gdp"]:,.2f} USD</div>', unsafe_allow_html=True)
     with col2:
-        avg_gini = filtered_static['Gini_Coefficient'].mean()
-        st.markdown(f'<div class="metric-card"><b>Avg Gini Coefficient</b><br>{avg_gini:.2f}</div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="metric-card"><b>Avg Gini Coefficient</b><br>{kpis["avg_gini"]:.2f}</div>', unsafe_allow_html=True)
     with col3:
-        avg_unemp = filtered_static['Unemployment_Rate'].mean()
-        st.markdown(f'<div class="metric-card"><b>Avg Unemployment Rate</b><br>{avg_unemp:.2f}%</div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="metric-card"><b>Avg Unemployment Rate</b><br>{kpis["avg_unemp"]:.2f}%</div>', unsafe_allow_html=True)
 
     # Treemap for GDP contribution
     st.subheader("GDP Contribution by Country (2023)")
-    fig_tree = px.treemap(filtered_static, path=['Country'], values='GDP_Current_USD',
-                          color='GDP_Per_Capita_Calc', hover_data=['Country'],
-                          color_continuous_scale='Blues', title="GDP Contribution")
-    st.plotly_chart(fig_tree, use_container_width=True)
+    st.plotly_chart(view['fig_tree'], use_container_width=True)
     st.markdown('</div>', unsafe_allow_html=True)
 
 with tab2:
     st.markdown('<div class="tab">', unsafe_allow_html=True)
     # Scatter plot with clustering
     st.subheader("GDP Per Capita vs. Gini Coefficient (2023)")
-    fig_scatter = px.scatter(filtered_static, x='GDP_Per_Capita_Calc', y='Gini_Coefficient',
-                             color='Cluster', size='Population_WB', hover_data=['Country', 'Unemployment_Rate'],
-                             title="Economic Clustering", opacity=0.8)
-    fig_scatter.update_layout(showlegend=True, plot_bgcolor="rgba(0,0,0,0)")
-    st.plotly_chart(fig_scatter, use_container_width=True)
+    st.plotly_chart(view['fig_scatter'], use_container_width=True)
 
     # Data table with download
     st.subheader("Economic Indicators Data")
-    st.dataframe(filtered_static[['Country', 'Year', 'GDP_Per_Capita_Calc', 'Gini_Coefficient', 'Unemployment_Rate', 'Cluster']],
-                 use_container_width=True)
-    csv = filtered_static.to_csv(index=False).encode('utf-8')
-    st.download_button("Download Data", csv, "economic_data.csv", "text/csv")
+    st.dataframe(view['table'], use_container_width=True)
+    st.download_button("Download Data", view['csv'], "economic_data.csv", "text/csv")
     st.markdown('</div>', unsafe_allow_html=True)
 
 with tab3:
     st.markdown('<div class="tab">', unsafe_allow_html=True)
     # Time-series plot
     st.subheader("GDP Per Capita Growth (2015-2023)")
-    fig_line = px.line(filtered_ts, x='Year', y='GDP_Per_Capita_Growth', color='Country',
-                       title="GDP Per Capita Growth", line_shape='spline')
-    fig_line.update_layout(showlegend=True, plot_bgcolor="rgba(0,0,0,0)")
-    st.plotly_chart(fig_line, use_container_width=True)
+    st.plotly_chart(view['fig_line'], use_container_width=True)
 
     # Choropleth map
     st.subheader("Gini Coefficient by Country (2023)")
-    fig_choro = px.choropleth(filtered_static, locations='Country', locationmode='country names',
-                              color='Gini_Coefficient', hover_data=['Country', 'GDP_Per_Capita_Calc'],
-                              title="Gini Coefficient", color_continuous_scale='Viridis')
-    fig_choro.update_layout(geo=dict(showframe=False, projection_type='equirectangular'))
-    st.plotly_chart(fig_choro, use_container_width=True)
+    st.plotly_chart(view['fig_choro'], use_container_width=True)
     st.markdown('</div>', unsafe_allow_html=True)
 
 # Footer
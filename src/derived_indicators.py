@@ -0,0 +1,211 @@
+import ast
+
+import numpy as np
+import pandas as pd
+
+# Derived indicators as expressions over base columns or other derived
+# indicators. Besides + - * / ** and log/sqrt/abs, expressions can use
+# functions that work within each country's rows ordered by Year:
+#   lag(x, n=1), diff(x, n=1), pct_change(x, n=1)  value n years earlier (NaN if that year is missing)
+#   rolling_mean(x, window=3)                       mean of the last window consecutive years
+#   zscore(x)                                       deviation from the country's mean in standard deviations
+DERIVED_INDICATORS = {
+    'GDP_Per_Capita_Calc': 'GDP_Current_USD / Population_WB',
+    'Trade_Balance': 'Exports_WB - Imports_WB',
+    'Trade_Balance_Pct_GDP': 'Trade_Balance / GDP_Current_USD * 100',
+    'Trade_Openness': '(Exports_WB + Imports_WB) / GDP_Current_USD * 100',
+    'GDP_Growth_YoY': 'pct_change(GDP_Current_USD) * 100',
+    'Population_Growth_YoY': 'pct_change(Population_WB) * 100',
+    'Exports_Growth_YoY': 'pct_change(Exports_WB) * 100',
+    'Inflation_3Y_Avg': 'rolling_mean(Inflation_Rate_WB, 3)',
+    'GDP_Growth_3Y_Avg': 'rolling_mean(GDP_Growth_YoY, 3)',
+    'Unemployment_Change': 'diff(Unemployment_Rate_WB)',
+    'Unemployment_ZScore': 'zscore(Unemployment_Rate_WB)',
+    'Inflation_ZScore': 'zscore(Inflation_Rate_WB)',
+}
+
+ELEMENTWISE_FUNCTIONS = {'log': np.log, 'sqrt': np.sqrt, 'abs': np.abs}
+GROUP_FUNCTIONS = {'lag': 1, 'diff': 1, 'pct_change': 1, 'rolling_mean': 3, 'zscore': None}
+BINARY_OPERATORS = {ast.Add: np.add, ast.Sub: np.subtract, ast.Mult: np.multiply,
+                    ast.Div: np.true_divide, ast.Pow: np.power}
+
+def parse_expression(name, expression):
+    """Parse and validate an indicator expression, returning its AST body."""
+    tree = ast.parse(expression, mode='eval').body
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or \
+                    node.func.id not in ELEMENTWISE_FUNCTIONS and node.func.id not in GROUP_FUNCTIONS:
+                raise ValueError(f"{name}: unknown function in {expression!r}")
+            if node.keywords or not node.args or \
+                    any(not isinstance(arg, ast.Constant) or not isinstance(arg.value, int) for arg in node.args[1:]):
+                raise ValueError(f"{name}: functions take an expression and optional integer arguments")
+        elif not isinstance(node, (ast.Name, ast.Constant, ast.BinOp, ast.UnaryOp, ast.Load,
+                                   ast.USub, ast.UAdd, *BINARY_OPERATORS)):
+            raise ValueError(f"{name}: unsupported syntax {type(node).__name__} in {expression!r}")
+    return tree
+
+def dependencies(tree):
+    return {node.id for node in ast.walk(tree) if isinstance(node, ast.Name)
+            and not (node.id in ELEMENTWISE_FUNCTIONS or node.id in GROUP_FUNCTIONS)}
+
+def resolve(indicators, available, names=None):
+    """Order the requested indicators so each comes after the ones it uses.
+
+    Returns (ordered names, parsed trees, {skipped name: missing base columns}).
+    Indicators whose base columns are not all available are skipped, along
+    with everything that depends on them.
+    """
+    trees = {name: parse_expression(name, expression) for name, expression in indicators.items()}
+    order, missing = [], {}
+    state = {}
+
+    def visit(name, path):
+        if state.get(name) == 'done':
+            return
+        if state.get(name) == 'visiting':
+            raise ValueError(f"Cyclic derived indicators: {' -> '.join(path + [name])}")
+        state[name] = 'visiting'
+        lacking = set()
+        for dep in sorted(dependencies(trees[name])):
+            if dep in trees:
+                visit(dep, path + [name])
+                lacking |= missing.get(dep, set())
+            elif dep not in available:
+                lacking.add(dep)
+        state[name] = 'done'
+        if lacking:
+            missing[name] = lacking
+        else:
+            order.append(name)
+
+    for name in names if names is not None else indicators:
+        visit(name, [])
+    return order, trees, missing
+
+class Panel:
+    """Numeric columns of a (group, time) panel sorted once, with the group boundaries.
+
+    Values are evaluated in sorted order and scattered back to the frame's
+    row order at the end. Rows must be unique per (group, time).
+    """
+
+    def __init__(self, df, group, time, grouped):
+        self.df = df
+        self.order = None
+        if grouped:
+            codes = pd.factorize(df[group])[0]
+            self.time = df[time].to_numpy(dtype=float)
+            self.order = np.lexsort((self.time, codes))
+            codes, self.time = codes[self.order], self.time[self.order]
+            starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+            self.group_ids = np.cumsum(np.r_[True, codes[1:] != codes[:-1]]) - 1
+            self.position = np.arange(len(codes)) - starts[self.group_ids]
+            self.n_groups = len(starts)
+
+    def column(self, name):
+        values = self.df[name].to_numpy(dtype=float)
+        return values if self.order is None else values[self.order]
+
+    def unsort(self, values):
+        if self.order is None:
+            return values
+        out = np.empty_like(values)
+        out[self.order] = values
+        return out
+
+    def lag(self, x, n):
+        if n == 0:
+            return x.copy()
+        # Years are unique and sorted within a group, so the row n years earlier
+        # is at most n rows back (fewer when years in between are missing)
+        out = np.full(len(x), np.nan)
+        for k in range(1, min(n, len(x) - 1) + 1):
+            found = np.flatnonzero((self.position[k:] >= k) & (self.time[k:] - self.time[:-k] == n)) + k
+            out[found] = x[found - k]
+        return out
+
+    def rolling_mean(self, x, window):
+        # Summed lag by lag so each row depends only on its own country's window; windows
+        # with a missing or non-finite value or a year gap are NaN
+        total = x.copy()
+        complete = np.isfinite(x)
+        for n in range(1, window):
+            lagged = self.lag(x, n)
+            complete &= np.isfinite(lagged)
+            total += lagged
+        return np.where(complete, total / window, np.nan)
+
+    def zscore(self, x):
+        valid = ~np.isnan(x)
+        n = np.bincount(self.group_ids, weights=valid, minlength=self.n_groups)
+        filled = np.where(valid, x, 0.0)
+        mean = np.bincount(self.group_ids, weights=filled, minlength=self.n_groups) / n
+        centered = np.where(valid, x - mean[self.group_ids], 0.0)
+        var = np.bincount(self.group_ids, weights=centered ** 2, minlength=self.n_groups) / (n - 1)
+        return (x - mean[self.group_ids]) / np.sqrt(var)[self.group_ids]
+
+def _uses_groups(trees):
+    return any(isinstance(node, ast.Call) and node.func.id in GROUP_FUNCTIONS
+               for tree in trees for node in ast.walk(tree))
+
+def derive(df, indicators=DERIVED_INDICATORS, names=None, group='Country', time='Year'):
+    """Return df with the derived indicators appended (or replaced) as columns.
+
+    All indicators are evaluated in one pass over NumPy arrays: the panel is
+    sorted by (group, time) at most once, and every distinct subexpression,
+    including other indicators, is computed once and shared.
+    """
+    if len(df) == 0:
+        return df
+    available = set(df.columns)
+    order, trees, missing = resolve(indicators, available - set(indicators), names)
+    for name, lacking in missing.items():
+        print(f"Cannot compute {name}: Missing {' or '.join(sorted(lacking))}")
+    if not order:
+        return df
+    panel = Panel(df, group, time, grouped=_uses_groups(trees[name] for name in order))
+    memo = {}
+
+    def lag_call(x_node, n):
+        return ast.Call(ast.Name('lag', ast.Load()), [x_node, ast.Constant(n)], [])
+
+    def evaluate(node):
+        if isinstance(node, ast.Call) and len(node.args) == 1 and GROUP_FUNCTIONS.get(node.func.id):
+            # Spell out default arguments so lag(x) and lag(x, 1) share one result
+            node = ast.Call(node.func, [node.args[0], ast.Constant(GROUP_FUNCTIONS[node.func.id])], [])
+        key = ast.dump(node)
+        if key in memo:
+            return memo[key]
+        if isinstance(node, ast.Name):
+            value = evaluate(trees[node.id]) if node.id in trees else panel.column(node.id)
+        elif isinstance(node, ast.Constant):
+            value = float(node.value)
+        elif isinstance(node, ast.UnaryOp):
+            value = -evaluate(node.operand) if isinstance(node.op, ast.USub) else evaluate(node.operand)
+        elif isinstance(node, ast.BinOp):
+            value = BINARY_OPERATORS[type(node.op)](evaluate(node.left), evaluate(node.right))
+        else:
+            fn = node.func.id
+            x = evaluate(node.args[0])
+            arg = node.args[1].value if len(node.args) > 1 else None
+            if fn in ELEMENTWISE_FUNCTIONS:
+                value = ELEMENTWISE_FUNCTIONS[fn](x)
+            elif fn == 'lag':
+                value = panel.lag(x, arg)
+            elif fn == 'diff':
+                value = x - evaluate(lag_call(node.args[0], arg))
+            elif fn == 'pct_change':
+                value = x / evaluate(lag_call(node.args[0], arg)) - 1
+            elif fn == 'rolling_mean':
+                value = panel.rolling_mean(x, arg)
+            else:
+                value = panel.zscore(x)
+        memo[key] = value
+        return value
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        columns = {name: panel.unsort(np.broadcast_to(evaluate(trees[name]), len(df)).astype(float))
+                   for name in order}
+    derived = pd.DataFrame(columns, index=df.index)
+    return pd.concat([df.drop(columns=[c for c in order if c in available]), derived], axis=1)
@@ -1,95 +1,216 @@
+import argparse
 import requests
 import pandas as pd
 import os
+import time
 from tqdm import tqdm
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-import json
+import metrics
+from atomic_files import atomic_path
+from column_store import load_frame, save_frame
+from countries import countries as wiki_countries
+from country_registry import load_registry, refresh_registry
+from http_cache import ResponseCache
+from http_client import FetchExecutor
+from wdi_bulk import read_wdi_bulk
 
-def fetch_worldbank_data(countries, indicators, years=(2015, 2023)):
-    # Map Wikipedia country names to World Bank country codes
-    country_codes = {
-        'United States': 'USA', 'China': 'CHN', 'India': 'IND', 'Germany': 'DEU',
-        'Brazil': 'BRA', 'Japan': 'JPN', 'United Kingdom': 'GBR', 'France': 'FRA',
-        'Canada': 'CAN', 'Australia': 'AUS', 'Russia': 'RUS', 'South Korea': 'KOR',
-        'Mexico': 'MEX', 'Indonesia': 'IDN', 'Nigeria': 'NGA', 'South Africa': 'ZAF',
-        'Argentina': 'ARG', 'Saudi Arabia': 'SAU', 'Italy': 'ITA', 'Spain': 'ESP',
-        'Turkey': 'TUR', 'Netherlands': 'NLD', 'Switzerland': 'CHE', 'Sweden': 'SWE',
-        'Belgium': 'BEL', 'Poland': 'POL', 'Thailand': 'THA', 'Malaysia': 'MYS',
-        'Philippines': 'PHL', 'Vietnam': 'VNM', 'Singapore': 'SGP', 'Egypt': 'EGY',
-        'Algeria': 'DZA', 'Morocco': 'MAR', 'Kenya': 'KEN', 'Ethiopia': 'ETH',
-        'Ghana': 'GHA', 'Pakistan': 'PAK', 'Bangladesh': 'BGD', 'Iran': 'IRN',
-        'United Arab Emirates': 'ARE', 'Qatar': 'QAT', 'Chile': 'CHL', 'Colombia': 'COL',
-        'Peru': 'PER', 'New Zealand': 'NZL', 'Norway': 'NOR', 'Denmark': 'DNK',
-        'Finland': 'FIN', 'Ireland': 'IRL'
-    }
+WB_API_URL = "https://api.worldbank.org/v2"
+
+def fetch_indicator_batch(client, country_batch, indicator_code, years, base_url=WB_API_URL, per_page=1000):
+    """Fetch one indicator for many countries and a date range, following pagination.
+
+    Returns parallel lists of ISO3 codes, years and values for the non-null entries.
+    """
+    codes, dates, values = [], [], []
+    url = f"{base_url}/country/{';'.join(country_batch)}/indicator/{indicator_code}"
+    params = {'date': f"{years[0]}:{years[1]}", 'format': 'json', 'per_page': per_page}
+    page, pages = 1, 1
+    while page <= pages:
+        response = client.get(url, params={**params, 'page': page}, timeout=30)
+        response.raise_for_status()
+        data = response.json()
+        # Error payloads come back as a single-element list with a message
+        if len(data) < 2 or not data[1]:
+            break
+        pages = int(data[0].get('pages') or 1)
+        for entry in data[1]:
+            value = entry.get('value')
+            if value is not None:
+                codes.append(entry.get('countryiso3code') or entry['country']['id'])
+                dates.append(int(entry['date']))
+                values.append(float(value))
+        page += 1
+    return codes, dates, values
+
+def fetch_worldbank_data(countries, indicators, years=(2015, 2023), batch_size=50, base_url=WB_API_URL, executor=None):
+    # Resolve names, aliases or ISO codes through the registry, keeping its canonical name
+    registry = load_registry()
+    code_to_name = registry.resolve(countries)
     
-    # Initialize data list
-    all_data = []
+    # Group countries so each indicator needs only a handful of paged requests
+    codes = list(code_to_name)
+    batches = [codes[i:i + batch_size] for i in range(0, len(codes), batch_size)]
+    tasks = [(indicator_code, indicator_name, batch)
+             for indicator_code, indicator_name in indicators.items() for batch in batches]
     
-    # Set up requests session with retries
-    session = requests.Session()
-    retries = Retry(total=3, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504])
-    session.mount('https://', HTTPAdapter(max_retries=retries))
+    def run_task(task):
+        indicator_code, indicator_name, batch = task
+        try:
+            return fetch_indicator_batch(client, batch, indicator_code, years, base_url)
+        except requests.exceptions.HTTPError as e:
+            print(f"HTTP error for {indicator_name} ({len(batch)} countries): {e}")
+        except requests.exceptions.ConnectionError as e:
+            print(f"Connection error for {indicator_name} ({len(batch)} countries): {e}")
+        except requests.exceptions.Timeout as e:
+            print(f"Timeout for {indicator_name} ({len(batch)} countries): {e}")
+        except requests.exceptions.RequestException as e:
+            print(f"Request error for {indicator_name} ({len(batch)} countries): {e}")
+        metrics.count('fetch.failed_batches')
+        return None
     
-    # Test a single API call for debugging
-    test_url = "https://api.worldbank.org/v2/country/USA/indicator/NY.GDP.MKTP.CD?date=2020&format=json"
+    # Run the batches concurrently; results come back in task order
+    client = executor or FetchExecutor()
     try:
-        test_response = session.get(test_url, timeout=10)
-        test_response.raise_for_status()
-        test_data = test_response.json()
-        print("Test API response:", json.dumps(test_data, indent=2))
-    except Exception as e:
-        print(f"Test API call failed: {e}")
-    
-    # Fetch data for each country, year, and indicator (fallback to single indicator calls)
-    for country in tqdm(countries, desc="Fetching countries"):
-        country_code = country_codes.get(country.title())
-        if not country_code:
-            print(f"No country code for {country}")
+        results = list(tqdm(client.imap(run_task, tasks), total=len(tasks), desc="Fetching indicator batches",
+                            disable=metrics.quiet()))
+    finally:
+        if executor is None:
+            client.close()
+    
+    collected = {indicator_code: ([], [], []) for indicator_code in indicators}
+    failed = []
+    for (indicator_code, indicator_name, batch), result in zip(tasks, results):
+        if result is None:
+            failed.extend((code_to_name[code], indicator_name) for code in batch)
             continue
-        
-        for year in range(years[0], years[1] + 1):
-            for indicator_code, indicator_name in indicators.items():
-                url = f"https://api.worldbank.org/v2/country/{country_code}/indicator/{indicator_code}?date={year}&format=json&per_page=1000"
-                try:
-                    response = session.get(url, timeout=10)
-                    response.raise_for_status()
-                    data = response.json()
-                    
-                    # Check if data is valid
-                    if len(data) > 1 and data[1] and len(data[1]) > 0:
-                        for entry in data[1]:
-                            value = entry.get('value')
-                            if value is not None:
-                                all_data.append({
-                                    'Country': country.title(),
-                                    'date': year,
-                                    indicator_name: float(value)
-                                })
-                                print(f"Fetched {indicator_name} for {country} in {year}: {value}")
-                            else:
-                                print(f"No data for {indicator_name} in {country} {year}")
-                    else:
-                        print(f"Empty response for {country} {year} {indicator_name}: {data}")
-                except requests.exceptions.HTTPError as e:
-                    print(f"HTTP error for {country} {year} {indicator_name}: {e}")
-                except requests.exceptions.ConnectionError as e:
-                    print(f"Connection error for {country} {year} {indicator_name}: {e}")
-                except requests.exceptions.Timeout as e:
-                    print(f"Timeout for {country} {year} {indicator_name}: {e}")
-                except requests.exceptions.RequestException as e:
-                    print(f"Request error for {country} {year} {indicator_name}: {e}")
-    
-    # Create DataFrame
-    df = pd.DataFrame(all_data)
-    if not df.empty:
-        df = df.groupby(['Country', 'date']).first().reset_index()
-    else:
+        for acc, part in zip(collected[indicator_code], result):
+            acc.extend(part)
+    
+    columns = {}
+    for indicator_code, indicator_name in indicators.items():
+        batch_codes, batch_dates, batch_values = collected[indicator_code]
+        if not batch_values:
+            metrics.log(f"No data for {indicator_name}")
+            continue
+        # Ignore codes the API echoes back that were not requested (e.g. aggregates)
+        names = [code_to_name.get(code) for code in batch_codes]
+        index = pd.MultiIndex.from_arrays([names, batch_dates], names=['Country', 'date'])
+        series = pd.Series(batch_values, index=index, name=indicator_name)
+        series = series[series.index.get_level_values('Country').notna()]
+        columns[indicator_name] = series[~series.index.duplicated()]
+    
+    # Create DataFrame: one row per (Country, date) that has at least one value
+    if not columns:
         print("No data collected. Falling back to CSV or check API connectivity.")
+        df = pd.DataFrame()
+        df.attrs['failed'] = failed
+        return df
+    df = pd.concat(columns.values(), axis=1).sort_index().reset_index()
+    # Categorical ISO3 key next to the name; its codes are the registry keys
+    df.insert(1, 'ISO3', registry.iso3_categorical(df['Country'].to_numpy()))
+    # (Country, indicator) pairs whose requests failed, for callers that track freshness
+    df.attrs['failed'] = failed
+    n_values = sum(s.size for s in columns.values())
+    metrics.count('fetch.values', n_values)
+    metrics.log(f"Fetched {n_values} values for {len(code_to_name)} countries")
     return df
 
-def main():
+def find_stale_cells(df_existing, fetch_log, countries, indicator_names, years, max_age_days=30, now=None):
+    """Return a long frame of (Country, date, indicator) cells that need fetching.
+
+    A cell is fetched when it is not in the file, is NaN and has not been
+    fetched within the freshness window (so known gaps are not re-requested on
+    every run), or was last fetched longer than max_age_days ago. Values
+    present in the file without a log entry are dated by the file itself.
+    """
+    now = time.time() if now is None else now
+    grid = pd.MultiIndex.from_product(
+        [sorted(set(countries)), range(years[0], years[1] + 1), indicator_names],
+        names=['Country', 'date', 'indicator'])
+    
+    present = pd.Series(False, index=grid)
+    known = [c for c in indicator_names if c in df_existing.columns]
+    if not df_existing.empty and known:
+        values = df_existing.set_index(['Country', 'date'])[known].stack()
+        values.index = values.index.set_names(['Country', 'date', 'indicator'])
+        present = values.notna().reindex(grid, fill_value=False)
+    
+    fetched_at = pd.Series(float('nan'), index=grid)
+    if not fetch_log.empty:
+        logged = fetch_log.set_index(['Country', 'date', 'indicator'])['fetched_at']
+        fetched_at = logged[~logged.index.duplicated(keep='last')].reindex(grid)
+    fetched_at = fetched_at.where(fetched_at.notna() | ~present, df_existing.attrs.get('mtime', now))
+    
+    max_age = max_age_days * 24 * 60 * 60
+    stale = fetched_at.isna() | (now - fetched_at > max_age)
+    return grid[stale.to_numpy()].to_frame(index=False)
+
+def fetch_worldbank_incremental(countries, indicators, years=(2015, 2023), path='data/worldbank_data.csv',
+                                log_path='data/worldbank_fetch_log.csv', max_age_days=30, executor=None):
+    """Fetch only missing or stale cells and upsert them into the existing file."""
+    registry = load_registry()
+    countries = [registry.name(c) for c in countries if registry.key(c) is not None]
+    try:
+        df_existing = load_frame(path).astype({'Country': str}).drop(columns=['ISO3'], errors='ignore')
+        df_existing.attrs['mtime'] = os.path.getmtime(path)
+    except FileNotFoundError:
+        df_existing = pd.DataFrame(columns=['Country', 'date'])
+    try:
+        fetch_log = pd.read_csv(log_path)
+    except FileNotFoundError:
+        fetch_log = pd.DataFrame(columns=['Country', 'date', 'indicator', 'fetched_at'])
+    
+    names_to_codes = {name: code for code, name in indicators.items()}
+    stale = find_stale_cells(df_existing, fetch_log, countries, list(names_to_codes), years, max_age_days)
+    metrics.count('fetch.stale_cells', len(stale))
+    metrics.log(f"{len(stale)} stale or missing cells to fetch")
+    if stale.empty:
+        return registry.canonicalize(df_existing, context=path) if not df_existing.empty else df_existing
+    
+    # One request group per (country set, year span); indicators sharing it are fetched together
+    groups = {}
+    for indicator_name, cells in stale.groupby('indicator', sort=False):
+        key = (tuple(sorted(cells['Country'].unique())), (int(cells['date'].min()), int(cells['date'].max())))
+        groups.setdefault(key, {})[names_to_codes[indicator_name]] = indicator_name
+    
+    fetched_at = time.time()
+    fetched, log_rows = [], []
+    for (group_countries, span), group_indicators in groups.items():
+        df_new = fetch_worldbank_data(list(group_countries), group_indicators, years=span, executor=executor)
+        fetched.append(df_new.drop(columns=['ISO3'], errors='ignore'))
+        failed = set(df_new.attrs.get('failed', []))
+        log_rows.append(pd.MultiIndex.from_tuples(
+            [(country, year, name)
+             for country in group_countries for name in group_indicators.values()
+             if (country, name) not in failed
+             for year in range(span[0], span[1] + 1)],
+            names=['Country', 'date', 'indicator']).to_frame(index=False))
+    
+    # Upsert: freshly fetched values win, existing values fill the rest
+    merged = df_existing.set_index(['Country', 'date'])
+    for df_new in fetched:
+        if not df_new.empty:
+            merged = df_new.set_index(['Country', 'date']).combine_first(merged)
+    ordered = [c for c in df_existing.columns if c in merged.columns] + \
+              [name for name in indicators.values() if name in merged.columns and name not in df_existing.columns]
+    merged = merged.reset_index()[['Country', 'date'] + [c for c in ordered if c not in ('Country', 'date')]]
+    merged = merged.sort_values(['Country', 'date'], ignore_index=True)
+    merged['date'] = merged['date'].astype(int)
+    merged.insert(1, 'ISO3', registry.iso3_categorical(merged['Country'].to_numpy()))
+    
+    new_log = pd.concat(log_rows, ignore_index=True)
+    new_log['fetched_at'] = fetched_at
+    # Concatenating an empty log would make pandas warn about (and guess) the column dtypes
+    if not fetch_log.empty:
+        new_log = pd.concat([fetch_log, new_log], ignore_index=True)
+    fetch_log = new_log.drop_duplicates(['Country', 'date', 'indicator'], keep='last')
+    
+    save_frame(merged, path)
+    with atomic_path(log_path) as tmp:
+        fetch_log.to_csv(tmp, index=False)
+    return merged
+
+def main(offline=False, use_cache=True, incremental=False, years=(2015, 2023), max_age_days=30,
+         all_economies=False, bulk=None):
     # Define World Bank indicators
     indicators = {
         'NY.GDP.MKTP.CD': 'GDP_Current_USD',
@@ -103,22 +224,76 @@ def main():
         'SP.POP.TOTL': 'Population_WB'
     }
     
-    # Load Wikipedia countries
-    try:
-        df_wiki = pd.read_csv('data/raw_economic_data.csv')
-        countries = df_wiki['Country'].tolist()
-    except FileNotFoundError:
-        print("Error: raw_economic_data.csv not found. Run scrape_economic_data.py first.")
-        return
+    # Same country list the scraper uses, with Wikipedia underscores removed
+    countries = [country.replace('_', ' ') for country in wiki_countries]
     
-    # Fetch data
-    df_wb = fetch_worldbank_data(countries, indicators)
+    if bulk:
+        # Read the cells from a local WDI bulk download instead of the API
+        with metrics.stage('fetch') as stage:
+            registry = load_registry()
+            if all_economies:
+                # Without registry metadata, every economy the download lists
+                countries = registry.economies() if registry.has_metadata() else None
+            stage.rows_in = None if countries is None else \
+                len(countries) * len(indicators) * (years[1] - years[0] + 1)
+            df_wb = read_wdi_bulk(bulk, countries, indicators, years)
+            stage.rows_out = len(df_wb)
+            if df_wb.empty:
+                print("Nothing read; data/worldbank_data.csv left unchanged")
+                return
+            save_frame(df_wb, 'data/worldbank_data.csv')
+        metrics.log(f"World Bank data from {bulk} saved to data/worldbank_data.csv")
+        metrics.log(f"World Bank dataset size: {df_wb.shape[0]} rows, {df_wb.shape[1]} columns")
+        return
     
-    # Save to CSV
-    os.makedirs('data', exist_ok=True)
-    df_wb.to_csv('data/worldbank_data.csv', index=False)
-    print("World Bank data saved to data/worldbank_data.csv")
-    print(f"World Bank dataset size: {df_wb.shape[0]} rows, {df_wb.shape[1]} columns")
+    # Fetch data, serving unchanged responses from the on-disk cache
+    cache = ResponseCache(offline=offline) if use_cache else None
+    with metrics.stage('fetch') as stage:
+        with FetchExecutor(cache=cache) as executor:
+            if all_economies:
+                # Every economy the World Bank reports on, from its country metadata
+                registry = load_registry()
+                if not registry.has_metadata():
+                    registry = refresh_registry(executor, base_url=f"{WB_API_URL}/country")
+                countries = registry.economies()
+            # Cells requested: every country, indicator and year
+            stage.rows_in = len(countries) * len(indicators) * (years[1] - years[0] + 1)
+            if incremental:
+                # Only missing or stale cells are fetched; the file is upserted in place
+                df_wb = fetch_worldbank_incremental(countries, indicators, years, max_age_days=max_age_days,
+                                                    executor=executor)
+            else:
+                df_wb = fetch_worldbank_data(countries, indicators, years, executor=executor)
+        if cache is not None:
+            metrics.log(f"HTTP cache: {cache.stats()}")
+            cache.close()
+        
+        stage.rows_out = len(df_wb)
+        # Save to CSV; an empty result (e.g. offline with a cold cache) keeps the previous file
+        if not incremental:
+            if df_wb.empty:
+                print("Nothing fetched; data/worldbank_data.csv left unchanged")
+                return
+            save_frame(df_wb, 'data/worldbank_data.csv')
+    metrics.log("World Bank data saved to data/worldbank_data.csv")
+    metrics.log(f"World Bank dataset size: {df_wb.shape[0]} rows, {df_wb.shape[1]} columns")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Fetch World Bank indicators for the scraped countries")
+    parser.add_argument('--offline', action='store_true', help="serve responses only from the HTTP cache")
+    parser.add_argument('--no-cache', action='store_true', help="bypass the HTTP cache")
+    parser.add_argument('--incremental', action='store_true',
+                        help="fetch only missing or stale cells and upsert them into data/worldbank_data.csv")
+    parser.add_argument('--years', type=int, nargs=2, default=(2015, 2023), metavar=('START', 'END'))
+    parser.add_argument('--max-age-days', type=float, default=30,
+                        help="refetch cells last fetched longer ago than this (incremental mode)")
+    parser.add_argument('--all-economies', action='store_true',
+                        help="fetch every World Bank economy in the country registry instead of the scraped list")
+    parser.add_argument('--bulk', metavar='PATH',
+                        help="read a local WDI bulk download (WDI_CSV.zip or its data CSV) instead of the API")
+    metrics.add_arguments(parser)
+    args = parser.parse_args()
+    metrics.configure_from_args(args)
+    main(offline=args.offline, use_cache=not args.no_cache, incremental=args.incremental,
+         years=tuple(args.years), max_age_days=args.max_age_days, all_economies=args.all_economies,
+         bulk=args.bulk)
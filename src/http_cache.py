@@ -0,0 +1,159 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from atomic_files import atomic_path
+
+DAY = 24 * 60 * 60
+
+# How long a cached response is served without revalidation, per host
+DEFAULT_TTLS = {
+    'api.worldbank.org': 30 * DAY,
+    'en.wikipedia.org': 7 * DAY,
+}
+
+class OfflineCacheMiss(requests.exceptions.ConnectionError):
+    """Raised in offline mode when a URL has no cached response."""
+
+class ResponseCache:
+    """Content-addressed on-disk HTTP response cache.
+
+    Bodies are stored once per content hash under ``objects/``; a SQLite
+    index maps request URLs to bodies along with their validators
+    (ETag/Last-Modified), fetch time and last access time. Once the stored
+    bodies exceed ``max_bytes`` the least recently used entries are evicted.
+    """
+
+    def __init__(self, root='data/http_cache', max_bytes=512 * 1024 * 1024, ttls=None,
+                 default_ttl=DAY, offline=False):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.ttls = DEFAULT_TTLS if ttls is None else ttls
+        self.default_ttl = default_ttl
+        self.offline = offline
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.lock = threading.Lock()
+        os.makedirs(os.path.join(root, 'objects'), exist_ok=True)
+        self.db = sqlite3.connect(os.path.join(root, 'index.sqlite'), check_same_thread=False, timeout=30)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                url TEXT PRIMARY KEY, host TEXT, body_hash TEXT, size INTEGER,
+                status INTEGER, headers TEXT, etag TEXT, last_modified TEXT,
+                fetched_at REAL, accessed_at REAL
+            )""")
+        self.db.commit()
+
+    def _object_path(self, body_hash):
+        return os.path.join(self.root, 'objects', body_hash[:2], body_hash)
+
+    def ttl(self, host):
+        return self.ttls.get(host, self.default_ttl)
+
+    def lookup(self, url):
+        """Return the cached entry for url as a dict, or None."""
+        with self.lock:
+            row = self.db.execute(
+                "SELECT url, host, body_hash, status, headers, etag, last_modified, fetched_at "
+                "FROM entries WHERE url = ?", (url,)).fetchone()
+        if row is None or not os.path.exists(self._object_path(row[2])):
+            return None
+        keys = ('url', 'host', 'body_hash', 'status', 'headers', 'etag', 'last_modified', 'fetched_at')
+        return dict(zip(keys, row))
+
+    def is_fresh(self, entry):
+        return time.time() - entry['fetched_at'] < self.ttl(entry['host'])
+
+    def conditional_headers(self, entry):
+        headers = {}
+        if entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def load(self, entry):
+        """Rebuild a requests.Response from a cached entry and mark it used."""
+        with open(self._object_path(entry['body_hash']), 'rb') as f:
+            body = f.read()
+        with self.lock:
+            self.db.execute("UPDATE entries SET accessed_at = ? WHERE url = ?", (time.time(), entry['url']))
+            self.db.commit()
+        response = requests.Response()
+        response.status_code = entry['status']
+        response.reason = 'OK'
+        response.url = entry['url']
+        response.headers = CaseInsensitiveDict(json.loads(entry['headers']))
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = body
+        return response
+
+    def refresh(self, entry):
+        """Record a successful revalidation (304) of an entry."""
+        now = time.time()
+        with self.lock:
+            self.db.execute("UPDATE entries SET fetched_at = ?, accessed_at = ? WHERE url = ?",
+                            (now, now, entry['url']))
+            self.db.commit()
+        entry['fetched_at'] = now
+
+    def store(self, url, host, response):
+        body = response.content
+        body_hash = hashlib.sha256(body).hexdigest()
+        path = self._object_path(body_hash)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with atomic_path(path) as tmp, open(tmp, 'wb') as f:
+                f.write(body)
+        headers = {k: v for k, v in response.headers.items()
+                   if k.lower() in ('content-type', 'etag', 'last-modified')}
+        now = time.time()
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, host, body_hash, len(body), response.status_code, json.dumps(headers),
+                 response.headers.get('ETag'), response.headers.get('Last-Modified'), now, now))
+            self.db.commit()
+        self.evict()
+
+    def total_bytes(self):
+        with self.lock:
+            row = self.db.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT body_hash, size FROM entries)").fetchone()
+        return row[0]
+
+    def evict(self):
+        """Drop least recently used entries until bodies fit in max_bytes."""
+        total = self.total_bytes()
+        if total <= self.max_bytes:
+            return
+        with self.lock:
+            rows = self.db.execute("SELECT url, body_hash, size FROM entries ORDER BY accessed_at").fetchall()
+            for url, body_hash, size in rows:
+                if total <= self.max_bytes:
+                    break
+                self.db.execute("DELETE FROM entries WHERE url = ?", (url,))
+                shared = self.db.execute("SELECT 1 FROM entries WHERE body_hash = ? LIMIT 1",
+                                         (body_hash,)).fetchone()
+                if not shared:
+                    try:
+                        os.remove(self._object_path(body_hash))
+                    except FileNotFoundError:
+                        pass
+                    total -= size
+            self.db.commit()
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'revalidated': self.revalidated,
+                'bytes': self.total_bytes()}
+
+    def close(self):
+        self.db.close()
@@ -0,0 +1,146 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import metrics
+from http_cache import OfflineCacheMiss
+
+# Default per-host request budgets as (requests per second, burst size)
+DEFAULT_RATE_LIMITS = {
+    'api.worldbank.org': (10.0, 10),
+    'en.wikipedia.org': (5.0, 5),
+}
+
+def make_session(pool_size=8):
+    """Create a requests session with pooled keep-alive connections and retries."""
+    session = requests.Session()
+    retries = Retry(total=3, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504])
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+class TokenBucket:
+    """Thread-safe token bucket; acquire() blocks until a token is available."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+class FetchExecutor:
+    """Bounded thread pool sharing one pooled session and per-host rate limits.
+
+    map() and imap() return results in input order, so output built from them is the
+    same as a serial run regardless of completion order. With a ResponseCache,
+    get() serves fresh entries from disk and revalidates stale ones. Requests,
+    retries, latency and cache outcomes are counted per host in the active
+    metrics stages.
+    """
+
+    def __init__(self, max_workers=8, rate_limits=None, default_rate=None, session=None, cache=None):
+        self.max_workers = max_workers
+        self.session = session or make_session(pool_size=max_workers)
+        self.rate_limits = DEFAULT_RATE_LIMITS if rate_limits is None else rate_limits
+        self.default_rate = default_rate
+        self.cache = cache
+        self.buckets = {}
+        self.buckets_lock = threading.Lock()
+        self.pool = ThreadPoolExecutor(max_workers=max_workers)
+
+    def _bucket(self, host):
+        with self.buckets_lock:
+            if host not in self.buckets:
+                limit = self.rate_limits.get(host, self.default_rate)
+                if limit is None:
+                    self.buckets[host] = None
+                elif isinstance(limit, tuple):
+                    self.buckets[host] = TokenBucket(*limit)
+                else:
+                    self.buckets[host] = TokenBucket(limit)
+            return self.buckets[host]
+
+    def get(self, url, params=None, headers=None, **kwargs):
+        url = requests.Request('GET', url, params=params).prepare().url
+        host = urlparse(url).hostname
+        headers = dict(headers or {})
+        entry = None
+        if self.cache is not None:
+            entry = self.cache.lookup(url)
+            if entry is not None and (self.cache.offline or self.cache.is_fresh(entry)):
+                with self.buckets_lock:
+                    self.cache.hits += 1
+                metrics.count('http.cache_hits', key=host)
+                return self.cache.load(entry)
+            if self.cache.offline:
+                raise OfflineCacheMiss(f"Offline and not cached: {url}")
+            if entry is not None:
+                headers.update(self.cache.conditional_headers(entry))
+
+        bucket = self._bucket(host)
+        if bucket is not None:
+            bucket.acquire()
+        start = time.perf_counter()
+        try:
+            response = self.session.get(url, headers=headers, **kwargs)
+        except requests.exceptions.RequestException:
+            metrics.count('http.requests', key=host)
+            metrics.count('http.errors', key=host)
+            raise
+        if metrics.enabled():
+            metrics.observe_latency('http.latency', time.perf_counter() - start, key=host)
+            metrics.count('http.requests', key=host)
+            retries = getattr(getattr(response.raw, 'retries', None), 'history', ())
+            if retries:
+                metrics.count('http.retries', len(retries), key=host)
+            if response.status_code >= 400:
+                metrics.count('http.errors', key=host)
+
+        if self.cache is not None:
+            if response.status_code == 304 and entry is not None:
+                self.cache.refresh(entry)
+                with self.buckets_lock:
+                    self.cache.revalidated += 1
+                metrics.count('http.cache_revalidated', key=host)
+                return self.cache.load(entry)
+            with self.buckets_lock:
+                self.cache.misses += 1
+            metrics.count('http.cache_misses', key=host)
+            if response.status_code == 200:
+                self.cache.store(url, host, response)
+        return response
+
+    def imap(self, fn, items):
+        return self.pool.map(metrics.propagate(fn), items)
+
+    def map(self, fn, items):
+        return list(self.imap(fn, items))
+
+    def close(self):
+        self.pool.shutdown(wait=True)
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
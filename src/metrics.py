@@ -0,0 +1,228 @@
+import contextlib
+import contextvars
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Upper bounds (milliseconds) of the request latency histogram buckets; the last is open-ended
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, float('inf'))
+
+# Process-wide settings, changed only through configure()
+_sink = None
+_quiet = False
+_profile = None
+_profile_dir = 'data/profiles'
+_sink_lock = threading.Lock()
+
+# Stages active in the current thread or task, innermost last
+_active = contextvars.ContextVar('metrics_active_stages', default=())
+
+def configure(path=None, quiet=None, profile=None, profile_dir=None):
+    """Set where records go and how much the stages report.
+
+    path is a JSON-lines file ('-' for stderr); without one, counters and
+    histograms are not collected at all. quiet silences progress output.
+    profile is 'cpu' (cProfile, dumped per stage to profile_dir) or 'memory'
+    (tracemalloc peak and top allocation sites in each stage record).
+    """
+    global _sink, _quiet, _profile, _profile_dir
+    if _sink not in (None, sys.stderr):
+        _sink.close()
+    _sink = None
+    if path == '-':
+        _sink = sys.stderr
+    elif path:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        _sink = open(path, 'a', buffering=1)
+    if quiet is not None:
+        _quiet = quiet
+    _profile = profile
+    if profile_dir:
+        _profile_dir = profile_dir
+
+def configure_from_env():
+    """Configure from ECON_METRICS, ECON_QUIET and ECON_PROFILE (for the dashboard)."""
+    configure(os.environ.get('ECON_METRICS'), quiet=bool(os.environ.get('ECON_QUIET')),
+              profile=os.environ.get('ECON_PROFILE') or None)
+
+def add_arguments(parser):
+    group = parser.add_argument_group('metrics')
+    group.add_argument('--metrics', metavar='PATH', help="append per-stage JSON records to PATH ('-' for stderr)")
+    group.add_argument('--quiet', action='store_true', help="suppress progress output")
+    group.add_argument('--profile', choices=['cpu', 'memory'], help="profile each stage (needs --metrics for memory)")
+    return parser
+
+def configure_from_args(args):
+    configure(args.metrics, quiet=args.quiet, profile=args.profile)
+
+def enabled():
+    return _sink is not None
+
+def quiet():
+    return _quiet
+
+def log(message):
+    """Progress output for humans; dropped in quiet mode."""
+    if not _quiet:
+        print(message)
+
+def emit(record):
+    if _sink is None:
+        return
+    line = json.dumps(record, default=str)
+    with _sink_lock:
+        _sink.write(line + '\n')
+
+def _label(name, key):
+    return name if key is None else f"{name}[{key}]"
+
+def count(name, n=1, key=None):
+    """Add n to a counter in every active stage, e.g. count('http.requests', key=host)."""
+    if _sink is None:
+        return
+    for stage in _active.get():
+        stage.add(_label(name, key), n)
+
+def observe_latency(name, seconds, key=None):
+    """Record a duration in every active stage's histogram for name."""
+    if _sink is None:
+        return
+    ms = seconds * 1000
+    for stage in _active.get():
+        stage.observe(_label(name, key), ms)
+
+def propagate(fn):
+    """Wrap fn so calls from pool threads see the caller's active stages."""
+    ctx = contextvars.copy_context()
+    return lambda *args, **kwargs: ctx.copy().run(fn, *args, **kwargs)
+
+def _status_kb(field):
+    try:
+        with open('/proc/self/status') as f:
+            return next((int(line.split()[1]) for line in f if line.startswith(field + ':')), None)
+    except OSError:
+        return None
+
+def peak_rss_mb():
+    """Peak resident set size of the process so far."""
+    kb = _status_kb('VmHWM')
+    if kb is None and resource is not None:
+        kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform == 'darwin':
+            kb //= 1024
+    return None if kb is None else round(kb / 1024, 1)
+
+class Stage:
+    """Measurements of one stage run; set rows_in/rows_out or add fields with set()."""
+
+    def __init__(self, name, parent):
+        self.name = name
+        self.parent = parent
+        self.rows_in = None
+        self.rows_out = None
+        self.fields = {}
+        self.counters = {}
+        self.histograms = {}
+        self.lock = threading.Lock()
+
+    def set(self, **fields):
+        self.fields.update(fields)
+
+    def add(self, key, n):
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + n
+
+    def observe(self, key, ms):
+        with self.lock:
+            hist = self.histograms.get(key)
+            if hist is None:
+                hist = self.histograms[key] = {'counts': [0] * len(LATENCY_BUCKETS_MS), 'sum_ms': 0.0,
+                                               'max_ms': 0.0}
+            hist['counts'][next(i for i, bound in enumerate(LATENCY_BUCKETS_MS) if ms <= bound)] += 1
+            hist['sum_ms'] += ms
+            hist['max_ms'] = max(hist['max_ms'], ms)
+
+    def rates(self):
+        """Per-host retry, error and cache hit rates from the http.* counters."""
+        hosts = {}
+        for key, value in self.counters.items():
+            name, _, host = key.partition('[')
+            if name.startswith('http.') and host:
+                hosts.setdefault(host.rstrip(']'), {})[name[5:]] = value
+        rates = {}
+        for host, c in hosts.items():
+            lookups = c.get('cache_hits', 0) + c.get('cache_misses', 0) + c.get('cache_revalidated', 0)
+            requests_sent = c.get('requests', 0)
+            rates[host] = {
+                'retry_rate': round(c.get('retries', 0) / requests_sent, 4) if requests_sent else None,
+                'error_rate': round(c.get('errors', 0) / requests_sent, 4) if requests_sent else None,
+                'cache_hit_rate': round(c.get('cache_hits', 0) / lookups, 4) if lookups else None,
+            }
+        return rates
+
+    def record(self, seconds, status):
+        record = {'type': 'stage', 'stage': self.name, 'parent': self.parent, 'status': status,
+                  'seconds': round(seconds, 4), 'rows_in': self.rows_in, 'rows_out': self.rows_out,
+                  'peak_rss_mb': peak_rss_mb(), **self.fields}
+        if self.counters:
+            record['counters'] = dict(sorted(self.counters.items()))
+            record['rates'] = self.rates()
+        if self.histograms:
+            record['latency_ms'] = {key: {'buckets': [str(b) for b in LATENCY_BUCKETS_MS], **hist}
+                                    for key, hist in sorted(self.histograms.items())}
+        return record
+
+@contextlib.contextmanager
+def stage(name):
+    """Time a stage and emit its record, with counters gathered while it ran.
+
+    Without a sink this only tracks wall time; profiling runs only when
+    configured, for the outermost stage of each thread.
+    """
+    active = _active.get()
+    current = Stage(name, active[-1].name if active else None)
+    token = _active.set(active + (current,))
+    profiler = None
+    tracing = False
+    if _profile == 'cpu' and not active:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Python 3.12+ allows one profiler at a time; concurrent stages go unprofiled
+            profiler = None
+    elif _profile == 'memory' and not active and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        tracing = True
+    start = time.perf_counter()
+    status = 'ok'
+    try:
+        yield current
+    except BaseException:
+        status = 'error'
+        raise
+    finally:
+        seconds = time.perf_counter() - start
+        _active.reset(token)
+        if profiler is not None:
+            profiler.disable()
+            os.makedirs(_profile_dir, exist_ok=True)
+            path = os.path.join(_profile_dir, f"{name}.prof")
+            profiler.dump_stats(path)
+            current.set(profile=path)
+        if tracing:
+            snapshot = tracemalloc.take_snapshot()
+            current.set(traced_peak_mb=round(tracemalloc.get_traced_memory()[1] / 2**20, 1),
+                        top_allocations=[str(stat) for stat in snapshot.statistics('lineno')[:10]])
+            tracemalloc.stop()
+        if _sink is not None:
+            emit(current.record(seconds, status))
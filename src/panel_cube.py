@@ -0,0 +1,186 @@
+import numpy as np
+import pandas as pd
+
+class PanelCube:
+    """Dense country x year x indicator panel in one contiguous float64 array.
+
+    Countries, years and indicators map to integer positions, so a cell, a
+    country's series or a year's cross-section is an O(1) view instead of a
+    scan over the long frame. Aggregates over the whole cube (cross-country
+    means, correlation matrices, rankings) are cached until the next update.
+    Missing cells are NaN; `present` marks the (country, year) rows the
+    source frame had, so to_frame() reproduces it.
+    """
+
+    def __init__(self, values, countries, years, indicators, present=None):
+        self.values = np.ascontiguousarray(values, dtype=np.float64)
+        self.countries = list(countries)
+        self.years = np.asarray(years, dtype=np.int64)
+        self.indicators = list(indicators)
+        self.present = (np.ones(self.values.shape[:2], dtype=bool) if present is None
+                        else np.asarray(present, dtype=bool))
+        self._reindex()
+
+    def _reindex(self):
+        self.country_pos = {country: i for i, country in enumerate(self.countries)}
+        self.year_pos = {int(year): j for j, year in enumerate(self.years)}
+        self.indicator_pos = {indicator: k for k, indicator in enumerate(self.indicators)}
+        self._cache = {}
+        self.version = getattr(self, 'version', -1) + 1
+
+    @classmethod
+    def from_frame(cls, df, indicators=None, country='Country', year='Year'):
+        """Build from a long frame with one row per (country, year); later duplicates win."""
+        if indicators is None:
+            indicators = [c for c in df.columns if c not in (country, year) and pd.api.types.is_numeric_dtype(df[c])]
+        country_codes, countries = pd.factorize(df[country].astype(str))
+        years = np.sort(df[year].dropna().unique()).astype(np.int64)
+        rows = df[year].notna().to_numpy()
+        ci = country_codes[rows]
+        yi = np.searchsorted(years, df[year].to_numpy()[rows])
+        values = np.full((len(countries), len(years), len(indicators)), np.nan)
+        values[ci, yi] = df.loc[rows, indicators].to_numpy(dtype=np.float64)
+        present = np.zeros(values.shape[:2], dtype=bool)
+        present[ci, yi] = True
+        return cls(values, countries, years, indicators, present)
+
+    def to_frame(self, country='Country', year='Year'):
+        """Long frame of the present rows, ordered by country then year."""
+        ci, yi = np.nonzero(self.present)
+        df = pd.DataFrame(self.values[ci, yi], columns=self.indicators)
+        df.insert(0, country, np.asarray(self.countries, dtype=object)[ci])
+        df.insert(1, year, self.years[yi])
+        return df
+
+    def country_index(self, countries):
+        """Positions of the given countries; unknown names are skipped."""
+        return np.array([self.country_pos[c] for c in countries if c in self.country_pos], dtype=np.intp)
+
+    def year_slice(self, start, stop):
+        """Slice of the year axis for the inclusive range [start, stop]."""
+        return slice(int(np.searchsorted(self.years, start, 'left')), int(np.searchsorted(self.years, stop, 'right')))
+
+    def get(self, country, year, indicator):
+        return self.values[self.country_pos[country], self.year_pos[int(year)], self.indicator_pos[indicator]]
+
+    def series(self, country, indicator):
+        """One country's values for every year (a view)."""
+        return self.values[self.country_pos[country], :, self.indicator_pos[indicator]]
+
+    def cross_section(self, year, indicator):
+        """Every country's value in one year (a view)."""
+        return self.values[:, self.year_pos[int(year)], self.indicator_pos[indicator]]
+
+    def matrix(self, indicator):
+        """Country x year matrix of one indicator (a view)."""
+        return self.values[:, :, self.indicator_pos[indicator]]
+
+    def select(self, countries=None, years=None, indicators=None):
+        """Sub-cube for the given countries, (start, stop) year range and indicators."""
+        ci = slice(None) if countries is None else self.country_index(countries)
+        yi = slice(None) if years is None else self.year_slice(*years)
+        ki = slice(None) if indicators is None else [self.indicator_pos[k] for k in indicators]
+        values = self.values[ci][:, yi][:, :, ki]
+        return PanelCube(values, np.asarray(self.countries, dtype=object)[ci], self.years[yi],
+                         np.asarray(self.indicators, dtype=object)[ki], self.present[ci][:, yi])
+
+    def _cached(self, key, compute):
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    def mean(self, indicator, countries=None, year=None):
+        """Cross-country mean per year, or for one year if given, skipping NaN.
+
+        Over all countries the per-year means are cached; for a selection only
+        the selected rows are touched.
+        """
+        k = self.indicator_pos[indicator]
+        if countries is None:
+            means = self._cached(('mean', k), lambda: _nanmean(self.values[:, :, k], axis=0))
+        else:
+            ci = self.country_index(countries)
+            if year is not None:
+                return _nanmean(self.values[ci, self.year_pos[int(year)], k], axis=0)
+            means = _nanmean(self.values[ci, :, k], axis=0)
+        return means if year is None else means[self.year_pos[int(year)]]
+
+    def corr(self, indicators=None, year=None):
+        """Pearson correlation between indicators over country-year cells, pairwise complete.
+
+        Matches DataFrame.corr() on the long frame (or one year's cross-section).
+        """
+        indicators = list(self.indicators if indicators is None else indicators)
+        key = ('corr', tuple(indicators), year)
+        return self._cached(key, lambda: pd.DataFrame(
+            _pairwise_corr(self._cells(indicators, year)), index=indicators, columns=indicators))
+
+    def _cells(self, indicators, year):
+        ki = [self.indicator_pos[k] for k in indicators]
+        if year is not None:
+            return self.values[:, self.year_pos[int(year)], :][:, ki]
+        return self.values[self.present][:, ki]
+
+    def ranking(self, indicator, year, ascending=False):
+        """Countries ordered by the indicator in one year (NaN last), with their values."""
+        def compute():
+            values = self.cross_section(year, indicator)
+            keys = values if ascending else -values
+            order = np.argsort(np.where(np.isnan(keys), np.inf, keys), kind='stable')
+            return pd.Series(values[order], index=np.asarray(self.countries, dtype=object)[order], name=indicator)
+        return self._cached(('ranking', indicator, int(year), ascending), compute)
+
+    def update(self, country, year, indicator, value):
+        """Set one existing cell and drop cached aggregates."""
+        i, j = self.country_pos[country], self.year_pos[int(year)]
+        self.values[i, j, self.indicator_pos[indicator]] = value
+        self.present[i, j] = True
+        self._cache.clear()
+        self.version += 1
+
+    def update_frame(self, df, country='Country', year='Year'):
+        """Upsert a long frame, growing the axes for new countries, years or indicators."""
+        other = PanelCube.from_frame(df, country=country, year=year)
+        countries = self.countries + [c for c in other.countries if c not in self.country_pos]
+        years = np.union1d(self.years, other.years)
+        indicators = self.indicators + [k for k in other.indicators if k not in self.indicator_pos]
+        if (len(countries), len(years), len(indicators)) != self.values.shape:
+            values = np.full((len(countries), len(years), len(indicators)), np.nan)
+            present = np.zeros(values.shape[:2], dtype=bool)
+            yi = np.searchsorted(years, self.years)
+            values[:len(self.countries), yi, :len(self.indicators)] = self.values
+            present[:len(self.countries), yi] = self.present
+            self.values, self.present = values, present
+            self.countries, self.years, self.indicators = countries, years, indicators
+        self._reindex()
+        ci = self.country_index(other.countries)
+        yi = np.searchsorted(self.years, other.years)
+        ki = [self.indicator_pos[k] for k in other.indicators]
+        # Only cells the frame actually has overwrite existing values
+        block = self.values[np.ix_(ci, yi, ki)]
+        new = other.values
+        self.values[np.ix_(ci, yi, ki)] = np.where(other.present[:, :, None] & ~np.isnan(new), new, block)
+        self.present[np.ix_(ci, yi)] |= other.present
+
+def _nanmean(values, axis):
+    counts = np.sum(~np.isnan(values), axis=axis)
+    sums = np.nansum(values, axis=axis)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return sums / counts
+
+def _pairwise_corr(X):
+    """Correlation matrix of X's columns using, for each pair, the rows where both are present."""
+    mask = ~np.isnan(X)
+    M = mask.astype(np.float64)
+    # Centering first keeps the sums of squares from cancelling for large magnitudes
+    X0 = np.where(mask, X - _nanmean(X, axis=0), 0.0)
+    n = M.T @ M
+    sx = X0.T @ M
+    sxx = (X0 ** 2).T @ M
+    sxy = X0.T @ X0
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cov = sxy - sx * sx.T / n
+        var_x = sxx - sx ** 2 / n
+        corr = cov / np.sqrt(var_x * var_x.T)
+    corr[n < 2] = np.nan
+    return np.clip(corr, -1.0, 1.0)
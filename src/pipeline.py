@@ -0,0 +1,211 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import metrics
+import snapshots
+from atomic_files import atomic_path
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+STATE_PATH = 'data/.pipeline_state.json'
+# Key of the file digest cache in the state file, next to the per-stage entries
+DIGESTS_KEY = 'digests'
+DAY = 24 * 60 * 60
+
+def run_scrape(offline):
+    import scrape_economic_data
+    scrape_economic_data.main(offline=offline)
+
+def run_fetch(offline):
+    import fetch_worldbank_data
+    fetch_worldbank_data.main(offline=offline)
+
+def run_preprocess(offline):
+    import preprocess_data
+    preprocess_data.preprocess_data()
+
+def run_cluster(offline):
+    import cluster_data
+    cluster_data.main()
+
+# Pipeline DAG. A stage runs when the hash of its inputs or code changes, an
+# output is missing, or (for network stages) its last run is older than max_age.
+# Files that are both input and output are updated in place by the stage.
+STAGES = {
+    'scrape': {
+        'run': run_scrape,
+        'inputs': [],
+        'outputs': ['data/raw_infobox_data.csv', 'data/raw_economic_data.csv'],
+        'code': ['scrape_economic_data.py', 'clean_economic_data.py', 'countries.py',
+                 'http_client.py', 'http_cache.py', 'column_store.py', 'atomic_files.py'],
+        'after': [],
+        'max_age': 7 * DAY,
+    },
+    'fetch': {
+        'run': run_fetch,
+        'inputs': ['data/country_registry.csv'],
+        'outputs': ['data/worldbank_data.csv'],
+        'code': ['fetch_worldbank_data.py', 'countries.py', 'country_registry.py', 'http_client.py',
+                 'http_cache.py', 'column_store.py', 'atomic_files.py', 'wdi_bulk.py'],
+        'after': [],
+        'max_age': 30 * DAY,
+    },
+    'preprocess': {
+        'run': run_preprocess,
+        'inputs': ['data/raw_economic_data.csv', 'data/worldbank_data.csv', 'data/country_registry.csv'],
+        'outputs': ['data/processed_economic_data.csv', 'data/processed_worldbank_data.csv'],
+        'code': ['preprocess_data.py', 'derived_indicators.py', 'country_registry.py', 'column_store.py',
+                 'atomic_files.py'],
+        'after': ['scrape', 'fetch'],
+        'max_age': None,
+    },
+    'cluster': {
+        'run': run_cluster,
+        'inputs': ['data/processed_economic_data.csv'],
+        'outputs': ['data/processed_economic_data.csv', 'models/cluster_model.joblib'],
+        'code': ['cluster_data.py', 'column_store.py', 'atomic_files.py'],
+        'after': ['preprocess'],
+        'max_age': None,
+    },
+}
+
+def run_stage(name, stage, offline):
+    # Outermost metrics stage of the worker thread, so per-stage profiling applies to it
+    with metrics.stage(f"pipeline.{name}"):
+        stage['run'](offline)
+
+def file_digest(path, digests=None):
+    """SHA-256 of a file; digests maps paths to earlier results, reused while size and mtime match."""
+    stat = os.stat(path)
+    known = (digests or {}).get(path)
+    if known and known['size'] == stat.st_size and known['mtime_ns'] == stat.st_mtime_ns:
+        return known['sha256']
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    if digests is not None:
+        digests[path] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest.hexdigest()}
+    return digest.hexdigest()
+
+def fingerprint(stage, offline, digests=None):
+    """Hash of the stage's code, parameters and current input files."""
+    digest = hashlib.sha256(json.dumps({'offline': offline}).encode())
+    for name in stage['code']:
+        digest.update(name.encode())
+        digest.update(file_digest(os.path.join(SRC_DIR, name), digests).encode())
+    for path in stage['inputs']:
+        digest.update(path.encode())
+        digest.update(file_digest(path, digests).encode() if os.path.exists(path) else b'missing')
+    return digest.hexdigest()
+
+def load_state(path=STATE_PATH):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def save_state(state, path=STATE_PATH):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with atomic_path(path) as tmp, open(tmp, 'w') as f:
+        json.dump(state, f, indent=2)
+
+def needs_run(name, stage, state, offline, force):
+    """Return (reason, fingerprint); reason is None when the stage can be skipped."""
+    current = fingerprint(stage, offline, state.get(DIGESTS_KEY))
+    previous = state.get(name)
+    if name in force:
+        return 'forced', current
+    if previous is None:
+        return 'never run', current
+    if any(not os.path.exists(path) for path in stage['outputs']):
+        return 'output missing', current
+    if previous['fingerprint'] != current:
+        return 'inputs or code changed', current
+    if stage['max_age'] is not None and time.time() - previous['finished_at'] > stage['max_age']:
+        return 'older than max age', current
+    return None, current
+
+def run_pipeline(stages=STAGES, force=(), offline=False, jobs=2, state_path=STATE_PATH):
+    """Run stages in dependency order, independent ones in parallel, skipping unchanged ones."""
+    state = load_state(state_path)
+    # File digests by (size, mtime), so a no-op rerun does not re-read large inputs
+    digests = state.setdefault(DIGESTS_KEY, {})
+    known = json.dumps(digests, sort_keys=True)
+    summary = {}
+    done, failed = set(), set()
+    running = {}
+    
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while len(done) + len(failed) < len(stages):
+            for name, stage in stages.items():
+                if name in done or name in failed or name in running:
+                    continue
+                if any(dep in failed for dep in stage['after']):
+                    failed.add(name)
+                    summary[name] = ('blocked', 0.0)
+                    continue
+                if not all(dep in done for dep in stage['after']):
+                    continue
+                # Anything upstream that reran invalidates this stage's fingerprint via its inputs
+                start = time.perf_counter()
+                reason, current = needs_run(name, stage, state, offline, force)
+                if reason is None:
+                    done.add(name)
+                    summary[name] = ('skipped', time.perf_counter() - start)
+                    continue
+                metrics.log(f"[pipeline] running {name} ({reason})")
+                running[name] = (pool.submit(run_stage, name, stage, offline), start)
+            if not running:
+                continue
+            finished, _ = wait([future for future, _ in running.values()], return_when=FIRST_COMPLETED)
+            for name, (future, start) in list(running.items()):
+                if future not in finished:
+                    continue
+                del running[name]
+                elapsed = time.perf_counter() - start
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"[pipeline] {name} failed: {e}")
+                    failed.add(name)
+                    summary[name] = ('failed', elapsed)
+                    continue
+                done.add(name)
+                summary[name] = ('ran', elapsed)
+                # Record in-place outputs as written, so the stage is a fixpoint on rerun
+                state[name] = {'fingerprint': fingerprint(stages[name], offline, digests),
+                               'finished_at': time.time()}
+                save_state(state, state_path)
+    if json.dumps(digests, sort_keys=True) != known:
+        save_state(state, state_path)
+    
+    # Publish the dashboard's datasets once every stage writing them is done, so readers never see a mix
+    writers = [name for name in stages if set(stages[name]['outputs']) & set(snapshots.PUBLISHED)]
+    statuses = [summary.get(name, ('not run',))[0] for name in writers]
+    if writers and all(status in ('ran', 'skipped') for status in statuses) and \
+            ('ran' in statuses or snapshots.current_version() is None):
+        snapshots.publish()
+    
+    metrics.log(f"{'stage':<12}{'status':<10}{'seconds':>9}")
+    for name in stages:
+        status, elapsed = summary.get(name, ('not run', 0.0))
+        metrics.log(f"{name:<12}{status:<10}{elapsed:>9.2f}")
+    metrics.emit({'type': 'pipeline', 'stages': {name: {'status': status, 'seconds': round(elapsed, 4)}
+                                                 for name, (status, elapsed) in summary.items()}})
+    return summary
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the data pipeline, skipping stages whose inputs are unchanged")
+    parser.add_argument('--force', nargs='*', metavar='STAGE',
+                        help="stages to rerun regardless of fingerprints (no names: all stages)")
+    parser.add_argument('--offline', action='store_true', help="network stages serve only from the HTTP cache")
+    parser.add_argument('--jobs', type=int, default=2, help="stages run in parallel")
+    metrics.add_arguments(parser)
+    args = parser.parse_args()
+    metrics.configure_from_args(args)
+    force = set() if args.force is None else set(args.force or STAGES)
+    run_pipeline(force=force, offline=args.offline, jobs=args.jobs)
@@ -1,41 +1,38 @@
+import argparse
 import pandas as pd
 import os
 import numpy as np
+import metrics
+from atomic_files import atomic_path
+from country_registry import load_registry
+from derived_indicators import derive
+from column_store import SCHEMA_FILE, TableWriter, iter_table, load_frame, read_schema, save_frame, store_path
 
-def preprocess_data():
-    # Define expected columns for Wikipedia data (subset based on available)
-    wiki_columns = [
-        'Country', 'Year', 'Currency', 'Population', 'GDP_Growth',
-        'GDP_Per_Capita', 'Inflation_Rate', 'Gini_Coefficient', 'Labor_Force',
-        'Unemployment_Rate', 'Main_Sectors', 'Foreign_Reserves'
-    ]
-    
-    # Define expected World Bank columns
-    wb_columns = [
-        'Country', 'date', 'GDP_Current_USD', 'GDP_Per_Capita_USD', 
-        'Inflation_Rate_WB', 'Unemployment_Rate_WB', 'GDP_Per_Capita_Growth', 
-        'Exports_WB', 'Imports_WB', 'Gini_Coefficient_WB', 'Population_WB'
-    ]
-    
-    # Load data
-    try:
-        df_wiki = pd.read_csv('data/raw_economic_data.csv')
-        df_wb = pd.read_csv('data/worldbank_data.csv')
-    except FileNotFoundError as e:
-        print(f"Error: {e}. Ensure raw_economic_data.csv and worldbank_data.csv exist.")
-        return
-    
-    # Verify columns
-    missing_wiki = [col for col in wiki_columns if col not in df_wiki.columns]
-    missing_wb = [col for col in wb_columns if col not in df_wb.columns]
-    if missing_wiki:
-        print(f"Warning: Missing columns in raw_economic_data.csv: {missing_wiki}")
-    if missing_wb:
-        print(f"Warning: Missing columns in worldbank_data.csv: {missing_wb}")
-    
+# Define expected columns for Wikipedia data (subset based on available)
+WIKI_COLUMNS = [
+    'Country', 'Year', 'Currency', 'Population', 'GDP_Growth',
+    'GDP_Per_Capita', 'Inflation_Rate', 'Gini_Coefficient', 'Labor_Force',
+    'Unemployment_Rate', 'Main_Sectors', 'Foreign_Reserves'
+]
+
+# Define expected World Bank columns
+WB_COLUMNS = [
+    'Country', 'date', 'GDP_Current_USD', 'GDP_Per_Capita_USD', 
+    'Inflation_Rate_WB', 'Unemployment_Rate_WB', 'GDP_Per_Capita_Growth', 
+    'Exports_WB', 'Imports_WB', 'Gini_Coefficient_WB', 'Population_WB'
+]
+
+# Year of the World Bank rows merged into the static dataset
+STATIC_YEAR = 2023
+
+def check_columns(columns, expected, name):
+    missing = [col for col in expected if col not in columns]
+    if missing:
+        print(f"Warning: Missing columns in {name}: {missing}")
+
+def prepare_wiki(df_wiki):
     # Rename columns for consistency
     df_wiki = df_wiki.rename(columns=lambda x: x.strip().replace(' ', '_'))
-    df_wb = df_wb.rename(columns={'date': 'Year'})
     
     # Filter Wikipedia data for latest year (e.g., 2023)
     if 'Year' in df_wiki.columns:
@@ -43,45 +40,175 @@ def preprocess_data():
     else:
         print("Warning: 'Year' column missing in raw_economic_data.csv. Using all data.")
     
-    # Standardize country names
-    df_wiki['Country'] = df_wiki['Country'].str.replace('_', ' ').str.title()
-    df_wb['Country'] = df_wb['Country'].str.replace('_', ' ').str.title()
-    
-    # Merge datasets for 2023
-    df_merged = pd.merge(
-        df_wiki,
-        df_wb[df_wb['Year'] == 2023],
-        on=['Country', 'Year'],
-        how='left'
-    )
+    # Canonical country names and the ISO3 join key from the registry
+    return load_registry().canonicalize(df_wiki, context='raw_economic_data.csv')
+
+def prepare_wb(df_wb):
+    """Rename and standardize a World Bank frame (or chunk of one)."""
+    df_wb = df_wb.rename(columns={'date': 'Year'})
+    return load_registry().canonicalize(df_wb, context='worldbank_data.csv')
+
+def build_static(df_wiki, df_wb_year):
+    """Merge Wikipedia data with one year of World Bank data and impute gaps."""
+    # Merge datasets for 2023 on the categorical ISO3 key; rows without one never match
+    df_wb_year = df_wb_year[df_wb_year['ISO3'].notna()].drop(columns=['Country'])
+    df_merged = pd.merge(df_wiki, df_wb_year, on=['ISO3', 'Year'], how='left')
     
     # Compute derived metrics
-    if 'GDP_Current_USD' in df_merged.columns and 'Population_WB' in df_merged.columns:
-        try:
-            df_merged['GDP_Per_Capita_Calc'] = df_merged['GDP_Current_USD'] / df_merged['Population_WB']
-        except Exception as e:
-            print(f"Error computing GDP_Per_Capita_Calc: {e}")
-    else:
-        print("Cannot compute GDP_Per_Capita_Calc: Missing GDP_Current_USD or Population_WB")
+    df_merged = derive(df_merged, names=['GDP_Per_Capita_Calc'])
     
-    # Handle missing values
+    # Handle missing values: one vectorized pass over all numeric columns
     numeric_columns = df_merged.select_dtypes(include=[np.number]).columns
-    for col in numeric_columns:
-        df_merged[col] = df_merged[col].fillna(df_merged[col].mean())
+    df_merged[numeric_columns] = df_merged[numeric_columns].fillna(df_merged[numeric_columns].mean())
     
     # Drop non-numeric or non-essential columns if necessary
-    df_merged = df_merged.drop(columns=['Currency', 'Main_Sectors'], errors='ignore')
+    return df_merged.drop(columns=['Currency', 'Main_Sectors'], errors='ignore')
+
+def iter_wb_chunks(path, memory_limit_mb):
+    """Yield the World Bank panel in row chunks sized to fit the memory ceiling."""
+    store = store_path(path)
+    if os.path.exists(os.path.join(store, SCHEMA_FILE)):
+        n_columns = len(read_schema(store)['columns'])
+    else:
+        with open(path) as f:
+            n_columns = len(f.readline().split(','))
+    # Budget roughly 4x the raw float64 size per row for parsing and pandas overhead
+    chunk_rows = max(1, int(memory_limit_mb * 2**20 // (n_columns * 8 * 4)))
+    if os.path.exists(os.path.join(store, SCHEMA_FILE)):
+        yield from iter_table(store, chunk_rows)
+        return
+    # Closes the file even when the caller stops early
+    with pd.read_csv(path, chunksize=chunk_rows) as reader:
+        yield from reader
+
+def country_blocks(chunks):
+    """Re-cut chunks at country boundaries so each country's rows arrive together.
+
+    The rows of the last country in a chunk are held back and prepended to
+    the next one. Rows must be grouped by country, as the fetcher writes
+    them; a country that reappears after its block raises ValueError.
+    """
+    carry = None
+    seen, current = set(), None
+    for chunk in chunks:
+        if not len(chunk):
+            continue
+        countries = chunk['Country'].to_numpy()
+        # Countries whose block starts in this chunk; none may have appeared before
+        starts = countries[np.r_[True, countries[1:] != countries[:-1]]].tolist()
+        if starts[0] == current:
+            starts = starts[1:]
+        if len(set(starts)) < len(starts) or seen.intersection(starts):
+            raise ValueError("World Bank rows are not grouped by country, which streaming requires")
+        seen.update(starts)
+        current = countries[-1]
+        if carry is not None:
+            chunk = pd.concat([carry, chunk], ignore_index=True)
+            countries = chunk['Country'].to_numpy()
+        split = len(chunk) - int((countries[::-1] != current).argmax() or len(chunk))
+        carry = chunk.iloc[split:]
+        if split:
+            yield chunk.iloc[:split]
+    if carry is not None and len(carry):
+        yield carry
+
+def preprocess_streaming(df_wiki, wb_path, memory_limit_mb=256):
+    """Stream the World Bank panel chunk by chunk.
+
+    Each chunk is standardized, extended with the derived indicators and
+    appended to the processed time-series outputs as soon as it is ready;
+    only the rows for STATIC_YEAR are kept for the static merge, which is
+    bounded by the number of countries.
+    """
+    ts_path = 'data/processed_worldbank_data.csv'
+    static_rows = []
+    rows = 0
+    with atomic_path(ts_path) as tmp_csv, TableWriter(store_path(ts_path)) as writer, \
+            open(tmp_csv, 'w', newline='') as csv_file:
+        def process(i, chunk):
+            if i == 0:
+                check_columns(chunk.columns, WB_COLUMNS, 'worldbank_data.csv')
+            chunk = prepare_wb(chunk)
+            static_rows.append(chunk[chunk['Year'] == STATIC_YEAR])
+            chunk = derive(chunk)
+            writer.append(chunk)
+            chunk.to_csv(csv_file, index=False, header=(i == 0))
+            metrics.count('preprocess.chunks')
+            return chunk
+        
+        # Per-country derived indicators need each country's rows in one chunk
+        chunk = None
+        for i, chunk in enumerate(country_blocks(iter_wb_chunks(wb_path, memory_limit_mb))):
+            chunk = process(i, chunk)
+            rows += len(chunk)
+        if chunk is None:
+            # A header-only panel yields no chunks; its empty outputs are still written
+            chunk = process(0, load_frame(wb_path))
+    metrics.log(f"Time-series data saved to {ts_path}")
+    metrics.log(f"Time-series dataset size: {rows} rows, {chunk.shape[1]} columns")
+    
+    df_wb_year = pd.concat(static_rows, ignore_index=True)
+    df_merged = build_static(df_wiki, df_wb_year)
+    df_merged.attrs['wb_rows'] = rows
+    return df_merged
+
+def preprocess_data(streaming=False, memory_limit_mb=256):
+    # Load data
+    try:
+        df_wiki = load_frame('data/raw_economic_data.csv')
+        if not streaming:
+            df_wb = load_frame('data/worldbank_data.csv')
+        elif not os.path.exists('data/worldbank_data.csv') and \
+                not os.path.exists(store_path('data/worldbank_data.csv')):
+            raise FileNotFoundError('data/worldbank_data.csv')
+    except FileNotFoundError as e:
+        print(f"Error: {e}. Ensure raw_economic_data.csv and worldbank_data.csv exist.")
+        return
     
-    # Save processed static data
-    os.makedirs('data', exist_ok=True)
-    df_merged.to_csv('data/processed_economic_data.csv', index=False)
-    print(f"Processed data saved to data/processed_economic_data.csv")
-    print(f"Processed dataset size: {df_merged.shape[0]} countries, {df_merged.shape[1]} columns")
+    with metrics.stage('preprocess') as stage:
+        # Verify columns
+        check_columns(df_wiki.columns, WIKI_COLUMNS, 'raw_economic_data.csv')
+        wiki_rows = len(df_wiki)
+        df_wiki = prepare_wiki(df_wiki)
+        
+        if streaming:
+            try:
+                df_merged = preprocess_streaming(df_wiki, 'data/worldbank_data.csv', memory_limit_mb)
+            except ValueError as e:
+                print(f"Error: {e}. Sort data/worldbank_data.csv by country or run without --streaming.")
+                return
+            wb_rows = df_merged.attrs['wb_rows']
+        else:
+            check_columns(df_wb.columns, WB_COLUMNS, 'worldbank_data.csv')
+            df_wb = prepare_wb(df_wb)
+            df_merged = build_static(df_wiki, df_wb[df_wb['Year'] == STATIC_YEAR])
+            # Growth, rolling and per-country indicators over the whole panel in one pass
+            df_wb = derive(df_wb)
+            wb_rows = len(df_wb)
+        
+        # Save processed static data
+        save_frame(df_merged, 'data/processed_economic_data.csv')
+        
+        if not streaming:
+            # Save processed time-series data
+            save_frame(df_wb, 'data/processed_worldbank_data.csv')
+        stage.rows_in = wiki_rows + wb_rows
+        stage.rows_out = len(df_merged) + wb_rows
+        stage.set(streaming=streaming, static_rows=len(df_merged), timeseries_rows=wb_rows)
     
-    # Save processed time-series data
-    df_wb.to_csv('data/processed_worldbank_data.csv', index=False)
-    print(f"Time-series data saved to data/processed_worldbank_data.csv")
-    print(f"Time-series dataset size: {df_wb.shape[0]} rows, {df_wb.shape[1]} columns")
+    metrics.log(f"Processed data saved to data/processed_economic_data.csv")
+    metrics.log(f"Processed dataset size: {df_merged.shape[0]} countries, {df_merged.shape[1]} columns")
+    if not streaming:
+        metrics.log(f"Time-series data saved to data/processed_worldbank_data.csv")
+        metrics.log(f"Time-series dataset size: {df_wb.shape[0]} rows, {df_wb.shape[1]} columns")
 
 if __name__ == "__main__":
-    preprocess_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Clean and merge the scraped and World Bank data")
+    parser.add_argument('--streaming', action='store_true',
+                        help="process the World Bank panel in chunks instead of loading it whole")
+    parser.add_argument('--memory-limit-mb', type=float, default=256,
+                        help="approximate memory ceiling per chunk in streaming mode")
+    metrics.add_arguments(parser)
+    args = parser.parse_args()
+    metrics.configure_from_args(args)
+    preprocess_data(streaming=args.streaming, memory_limit_mb=args.memory_limit_mb)
@@ -1,149 +1,132 @@
+import argparse
 import requests
 from bs4 import BeautifulSoup
 import pandas as pd
 import re
 import os
+import metrics
+from atomic_files import atomic_path
+from clean_economic_data import clean_infobox_data
+from column_store import save_frame
+from countries import countries
+from http_cache import ResponseCache
+from http_client import FetchExecutor
 
-# List of 50 countries (G20 + others for diversity)
-countries = [
-    'United_States', 'China', 'India', 'Germany', 'Brazil', 'Japan', 'United_Kingdom',
-    'France', 'Canada', 'Australia', 'Russia', 'South_Korea', 'Mexico', 'Indonesia',
-    'Nigeria', 'South_Africa', 'Argentina', 'Saudi_Arabia', 'Italy', 'Spain',
-    'Turkey', 'Netherlands', 'Switzerland', 'Sweden', 'Belgium', 'Poland', 'Thailand',
-    'Malaysia', 'Philippines', 'Vietnam', 'Singapore', 'Egypt', 'Algeria', 'Morocco',
-    'Kenya', 'Ethiopia', 'Ghana', 'Pakistan', 'Bangladesh', 'Iran', 'United_Arab_Emirates',
-    'Qatar', 'Chile', 'Colombia', 'Peru', 'New_Zealand', 'Norway', 'Denmark', 'Finland',
-    'Ireland'
-]
+TABLE_TAG = re.compile(r'<(/?)table\b([^>]*)>', re.IGNORECASE)
+CLASS_ATTR = re.compile(r'\bclass\s*=\s*(?:"([^"]*)"|\'([^\']*)\')', re.IGNORECASE)
 
-def clean_numeric_value(text):
-    """Extract numeric value from text (e.g., '$2.5 trillion' -> 2.5)."""
-    if not text:
-        return None
-    text = re.sub(r'[^\d.]', '', text)
-    try:
-        return float(text)
-    except ValueError:
-        return None
+def extract_infobox_html(html):
+    """Return the markup of the first table whose class list contains 'infobox'.
 
-def clean_percentage(text):
-    """Extract percentage value (e.g., '5.2%' -> 5.2)."""
-    if not text:
-        return None
-    match = re.search(r'[\d.]+', text)
-    if match:
-        return float(match.group())
-    return None
+    Scans table tags only, tracking nesting so the matching closing tag is
+    found, instead of building a tree of the whole page. Returns None if no
+    infobox table is present.
+    """
+    start = depth = None
+    for match in TABLE_TAG.finditer(html):
+        closing, attrs = match.group(1), match.group(2)
+        if start is None:
+            if closing:
+                continue
+            classes = CLASS_ATTR.search(attrs)
+            if classes and 'infobox' in (classes.group(1) or classes.group(2) or '').split():
+                start, depth = match.start(), 1
+        elif closing:
+            depth -= 1
+            if depth == 0:
+                return html[start:match.end()]
+        else:
+            depth += 1
+    # Unterminated table: let the parser close it at end of input
+    return html[start:] if start is not None else None
 
-def clean_population(text):
-    """Extract population in millions (e.g., '331 million' -> 331)."""
-    if not text:
-        return None
-    match = re.search(r'[\d.]+', text)
-    if match:
-        return float(match.group())
-    return None
+def find_infobox(html, fast=True):
+    """Locate the infobox table, parsing only its markup when fast is True."""
+    if fast:
+        snippet = extract_infobox_html(html)
+        if snippet is None:
+            return None
+        return BeautifulSoup(snippet, 'html.parser').find('table')
+    soup = BeautifulSoup(html, 'html.parser')
+    return soup.find('table', {'class': 'infobox'})
 
-def clean_currency(text):
-    """Extract currency name (e.g., 'US Dollar (USD)' -> 'USD')."""
-    if not text:
-        return None
-    match = re.search(r'\((.*?)\)', text) or re.search(r'\w+', text)
-    if match:
-        return match.group(1) if '(' in text else match.group(0)
-    return None
+def parse_economy_page(html, country, fast=True):
+    """Capture the raw header/value text of every infobox row.
 
-def clean_text(text):
-    """Clean text fields (e.g., economic sectors)."""
-    if not text:
+    Values are kept as scraped; clean_economic_data turns them into numbers,
+    so cleaning rules can change without scraping again.
+    """
+    infobox = find_infobox(html, fast=fast)
+    if not infobox:
+        metrics.count('scrape.no_infobox')
+        metrics.log(f"No infobox found for {country}")
         return None
-    return text.strip()
+    
+    records = []
+    base = {'Country': country.replace('_', ' '), 'Year': 2023}  # Assume latest year
+    for row in infobox.find_all('tr'):
+        header = row.find('th')
+        value = row.find('td')
+        if header and value:
+            records.append({**base, 'Header': header.text.strip(), 'Value': value.text.strip()})
+    return records
 
-def scrape_wikipedia_economic_data(country):
-    """Scrape economic data from a country's Wikipedia economy page."""
-    url = f"https://en.wikipedia.org/wiki/Economy_of_{country}"
+def scrape_wikipedia_economic_data(country, client=requests, base_url="https://en.wikipedia.org/wiki"):
+    """Scrape the raw infobox rows of a country's Wikipedia economy page."""
+    url = f"{base_url}/Economy_of_{country}"
     headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
     
     try:
-        response = requests.get(url, headers=headers)
+        response = client.get(url, headers=headers, timeout=30)
         response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Find the infobox table
-        infobox = soup.find('table', {'class': 'infobox'})
-        if not infobox:
-            print(f"No infobox found for {country}")
-            return None
-        
-        data = {'Country': country.replace('_', ' '), 'Year': 2023}  # Assume latest year
-        
-        # Extract indicators from infobox
-        rows = infobox.find_all('tr')
-        for row in rows:
-            header = row.find('th')
-            value = row.find('td')
-            if header and value:
-                header_text = header.text.strip().lower()
-                value_text = value.text.strip()
-                
-                # Map headers to indicators
-                if 'gdp' in header_text and 'nominal' in header_text:
-                    data['GDP_Nominal'] = clean_numeric_value(value_text)
-                elif 'gdp (ppp)' in header_text:
-                    data['GDP_PPP'] = clean_numeric_value(value_text)
-                elif 'gdp growth' in header_text:
-                    data['GDP_Growth'] = clean_percentage(value_text)
-                elif 'gdp per capita' in header_text:
-                    data['GDP_Per_Capita'] = clean_numeric_value(value_text)
-                elif 'inflation' in header_text:
-                    data['Inflation_Rate'] = clean_percentage(value_text)
-                elif 'unemployment' in header_text:
-                    data['Unemployment_Rate'] = clean_percentage(value_text)
-                elif 'population' in header_text:
-                    data['Population'] = clean_population(value_text)
-                elif 'gini' in header_text:
-                    data['Gini_Coefficient'] = clean_percentage(value_text)
-                elif 'hdi' in header_text:
-                    data['HDI'] = clean_numeric_value(value_text)
-                elif 'debt' in header_text and 'gdp' in header_text:
-                    data['Debt_to_GDP'] = clean_percentage(value_text)
-                elif 'trade balance' in header_text:
-                    data['Trade_Balance'] = clean_numeric_value(value_text)
-                elif 'currency' in header_text:
-                    data['Currency'] = clean_currency(value_text)
-                elif 'reserves' in header_text:
-                    data['Foreign_Reserves'] = clean_numeric_value(value_text)
-                elif 'labor force' in header_text:
-                    data['Labor_Force'] = clean_numeric_value(value_text)
-                elif 'exports' in header_text and 'goods' in header_text:
-                    data['Exports'] = clean_numeric_value(value_text)
-                elif 'imports' in header_text and 'goods' in header_text:
-                    data['Imports'] = clean_numeric_value(value_text)
-                elif 'poverty' in header_text:
-                    data['Poverty_Rate'] = clean_percentage(value_text)
-                elif 'main industries' in header_text or 'sectors' in header_text:
-                    data['Main_Sectors'] = clean_text(value_text)
-        
-        return data
+        return parse_economy_page(response.text, country)
     except Exception as e:
+        metrics.count('scrape.errors')
         print(f"Error scraping {country}: {e}")
         return None
 
-def main():
-    all_data = []
-    for country in countries:
-        print(f"Scraping data for {country}...")
-        data = scrape_wikipedia_economic_data(country)
-        if data:
-            all_data.append(data)
+def main(max_workers=8, offline=False, use_cache=True):
+    def scrape(country):
+        return scrape_wikipedia_economic_data(country, client)
     
-    # Create DataFrame and save to CSV
-    df = pd.DataFrame(all_data)
-    os.makedirs('data', exist_ok=True)
-    df.to_csv('data/raw_economic_data.csv', index=False)
-    print("Data scraped and saved to data/raw_economic_data.csv")
-    print(f"Dataset size: {df.shape[0]} countries, {df.shape[1]} columns")
+    # Pages are fetched concurrently but kept in country-list order; unchanged
+    # pages are served from the on-disk cache
+    cache = ResponseCache(offline=offline) if use_cache else None
+    with metrics.stage('scrape') as stage:
+        stage.rows_in = len(countries)
+        with FetchExecutor(max_workers=max_workers, cache=cache) as client:
+            results = client.map(scrape, countries)
+        if cache is not None:
+            metrics.log(f"HTTP cache: {cache.stats()}")
+            cache.close()
+        all_records = [record for records in results if records for record in records]
+        
+        # Persist the raw infobox text, then clean it into one row per country
+        df_raw = pd.DataFrame(all_records, columns=['Country', 'Year', 'Header', 'Value'])
+        # Nothing scraped (e.g. offline with a cold cache) keeps the previous files
+        if df_raw.empty:
+            print("Nothing scraped; data/raw_economic_data.csv left unchanged")
+            return
+        os.makedirs('data', exist_ok=True)
+        with atomic_path('data/raw_infobox_data.csv') as tmp:
+            df_raw.to_csv(tmp, index=False)
+        metrics.log(f"Raw infobox rows saved to data/raw_infobox_data.csv ({len(df_raw)} rows)")
+        with metrics.stage('clean_infobox') as clean:
+            clean.rows_in = len(df_raw)
+            df = clean_infobox_data(df_raw)
+            clean.rows_out = len(df)
+        save_frame(df, 'data/raw_economic_data.csv')
+        stage.rows_out = len(df)
+        stage.set(infobox_rows=len(df_raw))
+    metrics.log("Data scraped and saved to data/raw_economic_data.csv")
+    metrics.log(f"Dataset size: {df.shape[0]} countries, {df.shape[1]} columns")
     return df
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Scrape economy infoboxes from Wikipedia")
+    parser.add_argument('--offline', action='store_true', help="serve pages only from the HTTP cache")
+    parser.add_argument('--no-cache', action='store_true', help="bypass the HTTP cache")
+    metrics.add_arguments(parser)
+    args = parser.parse_args()
+    metrics.configure_from_args(args)
+    main(offline=args.offline, use_cache=not args.no_cache)
\ No newline at end of file
@@ -0,0 +1,158 @@
+import argparse
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import metrics
+from atomic_files import atomic_path
+from column_store import store_path
+
+# Published datasets live in data/snapshots/<version>/, one immutable directory
+# per publish; CURRENT names the version readers should use. Both the directory
+# and CURRENT appear by rename, so a reader sees a whole snapshot or none.
+SNAPSHOT_DIR = 'data/snapshots'
+CURRENT_FILE = 'CURRENT'
+# Datasets the dashboard reads
+PUBLISHED = ['data/processed_economic_data.csv', 'data/processed_worldbank_data.csv']
+VERSION_NAME = re.compile(r'^\d+-\d{8}T\d{6}$')
+
+def current_version(root=SNAPSHOT_DIR):
+    """Version named by CURRENT, or None if nothing was published."""
+    try:
+        with open(os.path.join(root, CURRENT_FILE)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+def dataset_path(csv_path, version, root=SNAPSHOT_DIR):
+    """Where a dataset of the given version is read from; the working copy for version None."""
+    if version is None:
+        return csv_path
+    return os.path.join(root, version, os.path.basename(csv_path))
+
+def _link_or_copy(src, dst):
+    # Writers replace files rather than rewrite them, so a hard link keeps the published bytes
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+def _versions(root):
+    """Published versions, oldest first (by sequence number, not name or mtime)."""
+    try:
+        names = os.listdir(root)
+    except FileNotFoundError:
+        return []
+    return sorted((name for name in names if VERSION_NAME.match(name)), key=lambda name: int(name.split('-')[0]))
+
+def publish(paths=PUBLISHED, root=SNAPSHOT_DIR, keep=3):
+    """Publish the datasets (CSV and column store) as a new snapshot and point CURRENT at it.
+
+    Versions are '<sequence>-<timestamp>', the sequence one past the newest
+    on disk. The newest keep snapshots, and whichever CURRENT names, stay on
+    disk so readers still loading an older one are not cut off.
+    """
+    stamp = time.strftime('%Y%m%dT%H%M%S')
+    tmp = os.path.join(root, f".tmp-{uuid.uuid4().hex}")
+    os.makedirs(tmp)
+    try:
+        for path in paths:
+            _link_or_copy(path, os.path.join(tmp, os.path.basename(path)))
+            store = store_path(path)
+            if os.path.isdir(store):
+                target = os.path.join(tmp, os.path.basename(store))
+                os.makedirs(target)
+                for name in os.listdir(store):
+                    _link_or_copy(os.path.join(store, name), os.path.join(target, name))
+        while True:
+            versions = _versions(root)
+            sequence = int(versions[-1].split('-')[0]) + 1 if versions else 1
+            version = f"{sequence:06d}-{stamp}"
+            try:
+                # Fails if a concurrent publish took this sequence number; take the next one
+                os.rename(tmp, os.path.join(root, version))
+                break
+            except OSError:
+                if not os.path.exists(os.path.join(root, version)):
+                    raise
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    with atomic_path(os.path.join(root, CURRENT_FILE)) as pointer, open(pointer, 'w') as f:
+        f.write(version + '\n')
+    current = current_version(root)
+    for old in _versions(root)[:-keep]:
+        if old != current:
+            shutil.rmtree(os.path.join(root, old), ignore_errors=True)
+    metrics.log(f"Published snapshot {version} to {root}")
+    return version
+
+class SnapshotCache:
+    """Loaded data per snapshot version, swapped to the newest once it is warm.
+
+    get() serves the active version and, when CURRENT names a newer one,
+    loads it in a background thread; requests keep getting the old data
+    until the new data is ready, so a publish never makes a reader wait.
+    Only the last keep versions stay in memory.
+    """
+
+    def __init__(self, load, root=SNAPSHOT_DIR, keep=2):
+        self.load = load
+        self.root = root
+        self.keep = keep
+        self.loaded = OrderedDict()
+        self.active = None
+        self.warming = None
+        self.failed = set()
+        self.lock = threading.Lock()
+
+    def get(self):
+        """(version, data) of the active snapshot; the first call loads in the foreground."""
+        latest = current_version(self.root)
+        with self.lock:
+            if not self.loaded:
+                self._store(latest, self.load(latest))
+            elif latest != self.active and self.warming is None and latest not in self.failed:
+                self.warming = threading.Thread(target=self._warm, args=(latest,), daemon=True)
+                self.warming.start()
+            return self.active, self.loaded[self.active]
+
+    def data(self, version):
+        """Data of a version, loading it again if it has been evicted."""
+        with self.lock:
+            if version in self.loaded:
+                return self.loaded[version]
+        return self.load(version)
+
+    def _warm(self, version):
+        try:
+            data = self.load(version)
+        except Exception as e:
+            print(f"Warning: could not load snapshot {version}: {e}")
+            with self.lock:
+                self.failed.add(version)
+                self.warming = None
+            return
+        with self.lock:
+            self._store(version, data)
+            self.warming = None
+        metrics.log(f"Switched to snapshot {version}")
+
+    def _store(self, version, data):
+        self.loaded[version] = data
+        self.loaded.move_to_end(version)
+        self.active = version
+        while len(self.loaded) > self.keep:
+            self.loaded.popitem(last=False)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Publish the processed datasets as a new snapshot")
+    parser.add_argument('--keep', type=int, default=3, help="snapshots to keep on disk")
+    metrics.add_arguments(parser)
+    args = parser.parse_args()
+    metrics.configure_from_args(args)
+    publish(keep=args.keep)
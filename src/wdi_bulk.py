@@ -0,0 +1,111 @@
+import contextlib
+import csv
+import io
+import re
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+import metrics
+from country_registry import load_registry
+
+# Data and country-metadata members of the WDI bulk download (WDI_CSV.zip);
+# older releases name the data file WDIData.csv
+WDI_DATA_FILE = re.compile(r'(^|/)WDI(CSV|Data)\.csv$', re.IGNORECASE)
+WDI_COUNTRY_FILE = re.compile(r'(^|/)WDICountry\.csv$', re.IGNORECASE)
+
+@contextlib.contextmanager
+def open_member(path, pattern):
+    """Text stream over the member of a WDI ZIP matching pattern, or over path itself if it is a CSV.
+
+    ZIP members are decompressed as they are read, so nothing is extracted to disk.
+    """
+    if not zipfile.is_zipfile(path):
+        with open(path, encoding='utf-8-sig', newline='') as f:
+            yield f
+        return
+    with zipfile.ZipFile(path) as archive:
+        member = next((name for name in archive.namelist() if pattern.search(name)), None)
+        if member is None:
+            raise FileNotFoundError(f"No member matching {pattern.pattern} in {path}")
+        with archive.open(member) as raw:
+            yield io.TextIOWrapper(raw, encoding='utf-8-sig', newline='')
+
+def wdi_economies(path):
+    """ISO3 codes of the economies in a WDI ZIP (aggregates have no region).
+
+    None when the download has no WDICountry.csv, including a bare data CSV.
+    """
+    if not zipfile.is_zipfile(path):
+        return None
+    try:
+        with open_member(path, WDI_COUNTRY_FILE) as f:
+            return [row['Country Code'] for row in csv.DictReader(f) if row.get('Region')]
+    except FileNotFoundError:
+        return None
+
+def read_wdi_bulk(path, countries, indicators, years=(2015, 2023)):
+    """Read the requested cells from a WDI bulk download into the fetch_worldbank_data() schema.
+
+    The wide CSV (one row per country and indicator, one column per year) is
+    parsed row by row and rows for other countries or indicators are skipped
+    before any value is converted, so memory grows with the selection, not
+    with the dump. countries are names or ISO3 codes; None takes every
+    economy listed in the download's WDICountry.csv, or every code in a bare
+    data CSV (aggregates included).
+    """
+    registry = load_registry()
+    if countries is None:
+        codes = wdi_economies(path)
+        code_to_name = None if codes is None else {code: registry.name(code) for code in codes}
+    else:
+        code_to_name = registry.resolve(countries)
+    indicator_pos = {code: k for k, code in enumerate(indicators)}
+    blocks, dump_names = {}, {}
+    rows_read = 0
+    with open_member(path, WDI_DATA_FILE) as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        name_col, code_col = header.index('Country Name'), header.index('Country Code')
+        indicator_col = header.index('Indicator Code')
+        year_cols = [(j, int(h)) for j, h in enumerate(header) if h.strip().isdigit()
+                     and years[0] <= int(h) <= years[1]]
+        for row in reader:
+            rows_read += 1
+            code = row[code_col]
+            k = indicator_pos.get(row[indicator_col])
+            if k is None or (code_to_name is not None and code not in code_to_name):
+                continue
+            block = blocks.get(code)
+            if block is None:
+                block = blocks[code] = np.full((len(year_cols), len(indicators)), np.nan)
+                dump_names[code] = row[name_col]
+            for i, (j, _) in enumerate(year_cols):
+                if row[j]:
+                    block[i, k] = float(row[j])
+    metrics.count('wdi_bulk.rows_read', rows_read)
+
+    if not blocks:
+        print(f"No data for the requested countries and indicators in {path}")
+        return pd.DataFrame()
+    # Registry names where known, so the output joins like the API fetch; the dump's name otherwise
+    codes = list(blocks)
+    names = [(code_to_name or {}).get(code) or registry.name(code) or dump_names[code] for code in codes]
+    values = np.stack([blocks[code] for code in codes]).reshape(-1, len(indicators))
+    df = pd.DataFrame(values, columns=list(indicators.values()))
+    df.insert(0, 'Country', np.repeat(names, len(year_cols)))
+    df.insert(1, 'ISO3', np.repeat(codes, len(year_cols)))
+    df.insert(2, 'date', np.tile([year for _, year in year_cols], len(codes)))
+
+    # Same shape as the API fetch: indicators with data, rows with at least one value
+    empty = [name for name in indicators.values() if df[name].isna().all()]
+    for name in empty:
+        metrics.log(f"No data for {name}")
+    df = df.drop(columns=empty)
+    df = df[df.iloc[:, 3:].notna().any(axis=1)].sort_values(['Country', 'date'], ignore_index=True)
+    df['ISO3'] = registry.iso3_categorical(df['ISO3'].to_numpy())
+    n_values = int(df.iloc[:, 3:].notna().to_numpy().sum())
+    metrics.count('fetch.values', n_values)
+    metrics.log(f"Read {n_values} values for {len(codes)} countries from {rows_read} rows of {path}")
+    return df
@@ -0,0 +1,52 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import cluster_data
+from column_store import load_frame, save_frame
+
+
+def economies(n, seed):
+    """Two well-separated groups: rich and equal, poor and unequal."""
+    rng = np.random.default_rng(seed)
+    rich = np.arange(n) % 2 == 0
+    return pd.DataFrame({
+        'Country': [f"Country {i:02d}" for i in range(n)],
+        'GDP_Per_Capita_Calc': np.where(rich, 50000, 3000) * rng.uniform(0.9, 1.1, n),
+        'Gini': np.where(rich, 30, 50) + rng.normal(0, 1, n),
+    })
+
+
+def test_fit_save_assign_only_round_trip(tmp_path):
+    path, model_path = str(tmp_path / 'static.csv'), str(tmp_path / 'model.joblib')
+    df = economies(20, seed=0).rename(columns={'Gini': 'Gini_Coefficient'})
+    save_frame(df, path)
+    cluster_data.main(path, k=2, model_path=model_path)
+    fitted = load_frame(path)['Cluster'].to_numpy()
+    # Cluster 0 is the lower-GDP group, however KMeans numbered them
+    assert (fitted == (np.arange(20) % 2 == 0)).all()
+
+    # Refitting is skipped: rows keep their labels even if the data moves a little
+    saved = os.stat(model_path).st_mtime_ns
+    df['GDP_Per_Capita_Calc'] *= 1.05
+    save_frame(df, path)
+    cluster_data.main(path, assign_only=True, model_path=model_path)
+    assert (load_frame(path)['Cluster'].to_numpy() == fitted).all()
+    assert os.stat(model_path).st_mtime_ns == saved
+
+
+def test_by_year_labels_each_year(tmp_path):
+    years = [economies(20, seed=year).assign(Year=year) for year in (2021, 2022)]
+    # Too few complete rows to cluster: that year is left unlabeled
+    years.append(economies(2, seed=0).assign(Year=2023))
+    df_ts = pd.concat(years, ignore_index=True).rename(columns={'Gini': 'Gini_Coefficient_WB'})
+    path = str(tmp_path / 'timeseries.csv')
+    save_frame(df_ts, path)
+    cluster_data.main_by_year(path, k=2)
+    out = load_frame(path)
+    labelled = out[out['Year'] < 2023]
+    assert (labelled['Cluster'].to_numpy() == (labelled.index % 2 == 0)).all()
+    assert out.loc[out['Year'] == 2023, 'Cluster'].isna().all()
+    pd.testing.assert_series_equal(out['Cluster'], cluster_data.cluster_by_year(df_ts, cluster_data.TS_FEATURES, 2),
+                                   check_names=False)
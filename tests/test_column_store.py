@@ -0,0 +1,19 @@
+import numpy as np
+import pandas as pd
+
+from column_store import load_frame, save_frame
+
+
+def test_year_columns_read_back_numeric(tmp_path):
+    path = str(tmp_path / 'table.csv')
+    # An empty frame has object columns; Year must still come back as a number
+    save_frame(pd.DataFrame(columns=['Country', 'Year']), path)
+    df = load_frame(path)
+    assert df['Year'].dtype == np.int16
+    assert np.isnan(df['Year'].max())
+
+    save_frame(pd.DataFrame({'Country': ['A', 'B'], 'date': [2020, None]}), path)
+    df = load_frame(path)
+    assert df['date'].dtype == np.float64
+    assert df['date'].max() == 2020
+    assert isinstance(df['Country'].dtype, pd.CategoricalDtype)
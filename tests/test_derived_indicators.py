@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from derived_indicators import derive
+
+INDICATORS = {
+    'Lag2': 'lag(Value, 2)',
+    'Diff': 'diff(Value)',
+    'Pct': 'pct_change(Value)',
+    'Rolling': 'rolling_mean(Value, 3)',
+    'ZScore': 'zscore(Value)',
+}
+
+
+@pytest.fixture
+def panel():
+    """Five countries over 2000-2019 with missing years and values, rows shuffled."""
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'Country': np.repeat([f"Country {c}" for c in 'ABCDE'], 20),
+        'Year': np.tile(np.arange(2000, 2020), 5),
+        'Value': rng.lognormal(3, 1, 100),
+    })
+    df.loc[rng.random(100) < 0.1, 'Value'] = np.nan
+    df = df[rng.random(100) > 0.2]
+    return df.sample(frac=1, random_state=1)
+
+
+def reference(df):
+    """The indicators via pandas groupby, on the panel reindexed to every year so gaps become NaN."""
+    index = pd.MultiIndex.from_product([df['Country'].unique(), range(2000, 2020)], names=['Country', 'Year'])
+    full = df.set_index(['Country', 'Year'])['Value'].reindex(index)
+    grouped = full.groupby(level='Country')
+    expected = pd.DataFrame({
+        'Lag2': grouped.shift(2),
+        'Diff': full - grouped.shift(1),
+        'Pct': grouped.pct_change(fill_method=None),
+        'Rolling': grouped.rolling(3, min_periods=3).mean().droplevel(0),
+        'ZScore': grouped.transform(lambda s: (s - s.mean()) / s.std()),
+    })
+    return expected.reindex(pd.MultiIndex.from_frame(df[['Country', 'Year']])).reset_index(drop=True)
+
+
+def test_group_functions_match_pandas(panel):
+    out = derive(panel, INDICATORS)
+    # Rows keep their (shuffled) order and index
+    pd.testing.assert_index_equal(out.index, panel.index)
+    pd.testing.assert_frame_equal(out[list(INDICATORS)].reset_index(drop=True), reference(panel))
+
+
+def test_rolling_mean_skips_non_finite_windows(panel):
+    panel = panel.copy()
+    row = panel.index[(panel['Country'] == 'Country A').to_numpy()][0]
+    panel.loc[row, 'Value'] = np.inf
+    out = derive(panel, INDICATORS)
+    country = panel['Country'] == 'Country A'
+    year = panel.loc[row, 'Year']
+    affected = country & panel['Year'].between(year, year + 2)
+    assert out.loc[affected, 'Rolling'].isna().all()
+    # Other countries are untouched
+    expected = derive(panel.assign(Value=panel['Value'].where(~country)), INDICATORS)
+    pd.testing.assert_series_equal(out.loc[~country, 'Rolling'], expected.loc[~country, 'Rolling'])
+
+
+def test_cyclic_indicators_raise(panel):
+    with pytest.raises(ValueError, match='Cyclic derived indicators: A -> B -> A'):
+        derive(panel, {'A': 'B + 1', 'B': 'A * 2'})
+
+
+def test_indicators_with_missing_columns_are_skipped(panel, capsys):
+    out = derive(panel, {'Double': 'Value * 2', 'Missing': 'Other + 1', 'Dependent': 'Missing * Value'})
+    assert 'Double' in out.columns
+    assert 'Missing' not in out.columns and 'Dependent' not in out.columns
+    printed = capsys.readouterr().out
+    assert 'Cannot compute Missing: Missing Other' in printed
+    assert 'Cannot compute Dependent: Missing Other' in printed
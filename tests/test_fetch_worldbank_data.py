@@ -0,0 +1,95 @@
+import math
+
+import pandas as pd
+import pytest
+import requests
+
+from country_registry import load_registry
+from fetch_worldbank_data import fetch_worldbank_data
+from http_client import FetchExecutor
+from mock_servers import MockServer, worldbank_handler
+
+INDICATORS = {f"IND.{i}": name for i, name in enumerate(
+    ['GDP_Current_USD', 'GDP_Per_Capita_USD', 'Inflation_Rate_WB', 'Unemployment_Rate_WB',
+     'GDP_Per_Capita_Growth', 'Exports_WB', 'Imports_WB', 'Gini_Coefficient_WB', 'Population_WB'])}
+YEARS = (2015, 2023)
+
+
+def fetch_per_cell(base_url, codes, indicators, years):
+    """The original fetch: one request per country, year and indicator."""
+    registry = load_registry()
+    rows = []
+    with requests.Session() as session:
+        for code in codes:
+            for year in range(years[0], years[1] + 1):
+                for indicator_code, indicator_name in indicators.items():
+                    response = session.get(f"{base_url}/country/{code}/indicator/{indicator_code}",
+                                           params={'date': year, 'format': 'json', 'per_page': 1000})
+                    response.raise_for_status()
+                    for entry in response.json()[1]:
+                        if entry['value'] is not None:
+                            rows.append({'Country': registry.name(code), 'date': year,
+                                         indicator_name: float(entry['value'])})
+    df = pd.DataFrame(rows).groupby(['Country', 'date']).first().reset_index()
+    return df[['Country', 'date'] + [name for name in indicators.values() if name in df.columns]]
+
+
+@pytest.fixture
+def server():
+    with MockServer(worldbank_handler) as server:
+        yield server
+
+
+def test_batched_fetch_matches_per_cell_fetch(server):
+    codes = load_registry().economies()[:12]
+    indicators = dict(list(INDICATORS.items())[:3])
+    with FetchExecutor(max_workers=4, rate_limits={}) as executor:
+        df = fetch_worldbank_data(codes, indicators, YEARS, batch_size=5, base_url=f"{server.url}/v2",
+                                  executor=executor)
+    # One request per indicator and batch of five countries, instead of one per cell
+    assert server.requests == len(indicators) * math.ceil(len(codes) / 5)
+
+    expected = fetch_per_cell(f"{server.url}/v2", codes, indicators, YEARS)
+    pd.testing.assert_frame_equal(df.drop(columns=['ISO3']).astype({'Country': str}), expected)
+
+
+def test_request_count_for_all_economies(server):
+    codes = load_registry().economies()
+    with FetchExecutor(max_workers=4, rate_limits={}) as executor:
+        df = fetch_worldbank_data(codes, INDICATORS, YEARS, base_url=f"{server.url}/v2", executor=executor)
+    assert server.requests == len(INDICATORS) * math.ceil(len(codes) / 50)
+    assert df['Country'].nunique() == len(codes)
+
+
+def test_batches_follow_pagination(server):
+    codes = load_registry().economies()[:30]
+    with FetchExecutor(max_workers=2, rate_limits={}) as executor:
+        df = fetch_worldbank_data(codes, {'IND.0': 'GDP_Current_USD'}, (1960, 2023),
+                                  base_url=f"{server.url}/v2", executor=executor)
+    # 30 countries x 64 years = 1920 rows, two pages
+    assert server.requests == 2
+    assert df['Country'].nunique() == 30
+    assert df['date'].between(1960, 2023).all()
+
+
+def test_incremental_fetch_from_empty_state(server, tmp_path, monkeypatch):
+    import warnings
+    from functools import partial
+
+    import fetch_worldbank_data as module
+    monkeypatch.setattr(module, 'fetch_worldbank_data',
+                        partial(fetch_worldbank_data, base_url=f"{server.url}/v2"))
+    codes = load_registry().economies()[:5]
+    path, log_path = str(tmp_path / 'worldbank_data.csv'), str(tmp_path / 'fetch_log.csv')
+    with FetchExecutor(max_workers=2, rate_limits={}) as executor, warnings.catch_warnings():
+        warnings.simplefilter('error')
+        first = module.fetch_worldbank_incremental(codes, INDICATORS, YEARS, path=path, log_path=log_path,
+                                                   executor=executor)
+        requests_first = server.requests
+        # Everything is fresh now, so the second run sends nothing
+        second = module.fetch_worldbank_incremental(codes, INDICATORS, YEARS, path=path, log_path=log_path,
+                                                    executor=executor)
+    assert requests_first > 0 and server.requests == requests_first
+    assert len(pd.read_csv(log_path)) == len(codes) * len(INDICATORS) * (YEARS[1] - YEARS[0] + 1)
+    pd.testing.assert_frame_equal(first.astype({'Country': str}), second.astype({'Country': str}),
+                                  check_dtype=False, check_categorical=False)
@@ -0,0 +1,55 @@
+import json
+import os
+
+import pipeline
+
+
+def touch_stage(tmp_path, calls):
+    source, target = str(tmp_path / 'input.csv'), str(tmp_path / 'output.csv')
+
+    def run(offline):
+        calls.append(offline)
+        with open(target, 'w') as f:
+            f.write('done\n')
+    return {'copy': {'run': run, 'inputs': [source], 'outputs': [target], 'code': ['pipeline.py'],
+                     'after': [], 'max_age': None}}, source
+
+
+def test_digests_are_reused_while_size_and_mtime_match(tmp_path):
+    path = tmp_path / 'input.csv'
+    path.write_text('a\n1\n')
+    digests = {}
+    first = pipeline.file_digest(str(path), digests)
+    # Same size and mtime: the stored digest is trusted without reading the file
+    stat = path.stat()
+    path.write_text('a\n2\n')
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert pipeline.file_digest(str(path), digests) == first
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert pipeline.file_digest(str(path), digests) != first
+    assert pipeline.file_digest(str(path)) == digests[str(path)]['sha256']
+
+
+def test_unchanged_rerun_skips_without_reading_inputs(tmp_path, monkeypatch):
+    calls = []
+    stages, source = touch_stage(tmp_path, calls)
+    with open(source, 'w') as f:
+        f.write('a\n1\n')
+    state_path = str(tmp_path / 'state.json')
+    assert pipeline.run_pipeline(stages, state_path=state_path)['copy'][0] == 'ran'
+    with open(state_path) as f:
+        assert source in json.load(f)[pipeline.DIGESTS_KEY]
+
+    # The rerun is decided from the stored digests, without reading the input
+    opened = []
+    real_open = open
+    with monkeypatch.context() as patch:
+        patch.setattr('builtins.open', lambda path, *args, **kwargs: opened.append(path) or
+                      real_open(path, *args, **kwargs))
+        assert pipeline.run_pipeline(stages, state_path=state_path)['copy'][0] == 'skipped'
+    assert source not in opened
+
+    with open(source, 'w') as f:
+        f.write('a\n22\n')
+    assert pipeline.run_pipeline(stages, state_path=state_path)['copy'][0] == 'ran'
+    assert len(calls) == 2
@@ -0,0 +1,49 @@
+import os
+import pathlib
+
+import pandas as pd
+import pytest
+
+import metrics
+import preprocess_data
+from column_store import load_frame
+from synthetic import write_pipeline_inputs
+
+OUTPUTS = ['data/processed_economic_data.csv', 'data/processed_worldbank_data.csv']
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    write_pipeline_inputs(str(tmp_path), countries=30, years=20, indicators=9)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def run(streaming, memory_limit_mb=256):
+    preprocess_data.preprocess_data(streaming=streaming, memory_limit_mb=memory_limit_mb)
+    return [load_frame(path) for path in OUTPUTS] + [pd.read_csv(path) for path in OUTPUTS]
+
+
+def test_streaming_matches_in_memory(workdir):
+    expected = run(streaming=False)
+    # About 60 rows per chunk, so countries straddle chunk boundaries; counters need a sink
+    metrics.configure(path=str(workdir / 'metrics.jsonl'))
+    try:
+        with metrics.stage('test') as stage:
+            actual = run(streaming=True, memory_limit_mb=0.02)
+    finally:
+        metrics.configure()
+    assert stage.counters['preprocess.chunks'] > 5
+    for want, got in zip(expected, actual):
+        pd.testing.assert_frame_equal(got, want)
+
+
+def test_streaming_rejects_ungrouped_rows(workdir, capsys):
+    run(streaming=False)
+    before = [pathlib.Path(path).read_bytes() for path in OUTPUTS]
+    df = pd.read_csv('data/worldbank_data.csv')
+    df.sample(frac=1, random_state=0).to_csv('data/worldbank_data.csv', index=False)
+    preprocess_data.preprocess_data(streaming=True, memory_limit_mb=0.02)
+    assert 'not grouped by country' in capsys.readouterr().out
+    assert [pathlib.Path(path).read_bytes() for path in OUTPUTS] == before
+    assert not [name for name in os.listdir('data') if '.tmp' in name]
@@ -0,0 +1,58 @@
+import os
+import pathlib
+import threading
+
+import pytest
+
+import snapshots
+
+
+@pytest.fixture
+def datasets(tmp_path):
+    paths = []
+    for name in ('a.csv', 'b.csv'):
+        path = tmp_path / name
+        path.write_text('x\n1\n')
+        paths.append(str(path))
+    return paths
+
+
+def test_publish_keeps_newest_versions(tmp_path, datasets):
+    root = str(tmp_path / 'snapshots')
+    # Several publishes within one second must still prune in publish order
+    versions = [snapshots.publish(datasets, root, keep=3) for _ in range(6)]
+    assert sorted(name for name in os.listdir(root) if name != snapshots.CURRENT_FILE) == versions[-3:]
+    assert snapshots.current_version(root) == versions[-1]
+    assert pathlib.Path(snapshots.dataset_path(datasets[0], versions[-1], root)).read_text() == 'x\n1\n'
+
+
+def test_published_files_survive_rewrites(tmp_path, datasets):
+    root = str(tmp_path / 'snapshots')
+    version = snapshots.publish(datasets, root)
+    # Writers replace files, so the snapshot keeps the old bytes
+    tmp = datasets[0] + '.tmp'
+    with open(tmp, 'w') as f:
+        f.write('x\n2\n')
+    os.replace(tmp, datasets[0])
+    assert pathlib.Path(snapshots.dataset_path(datasets[0], version, root)).read_text() == 'x\n1\n'
+
+
+def test_cache_serves_old_data_until_new_version_is_loaded(tmp_path, datasets):
+    root = str(tmp_path / 'snapshots')
+    first = snapshots.publish(datasets, root)
+    release = threading.Event()
+
+    def load(version):
+        if version != first:
+            release.wait(5)
+        return f"data of {version}"
+
+    cache = snapshots.SnapshotCache(load, root)
+    assert cache.get() == (first, f"data of {first}")
+    second = snapshots.publish(datasets, root)
+    # The new version loads in the background while the old one is served
+    assert cache.get() == (first, f"data of {first}")
+    release.set()
+    cache.warming.join(5)
+    assert cache.get() == (second, f"data of {second}")
+    assert cache.data(first) == f"data of {first}"
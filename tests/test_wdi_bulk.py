@@ -0,0 +1,84 @@
+import os
+import zipfile
+
+import pandas as pd
+import pytest
+
+import fetch_worldbank_data
+from country_registry import load_registry
+from synthetic import write_wdi_zip
+from wdi_bulk import read_wdi_bulk, wdi_economies
+
+SELECTED = {f"SYN.IND.{i:05d}": f"Indicator_{i}" for i in range(9)}
+YEARS = (2015, 2023)
+
+
+def reference(path, countries, indicators, years):
+    """The expected output, built by loading the whole data file with pandas."""
+    with zipfile.ZipFile(path) as archive, archive.open('WDICSV.csv') as f:
+        wide = pd.read_csv(f, encoding='utf-8-sig', keep_default_na=False, na_values=[''])
+    wide = wide[wide['Country Code'].isin(countries) & wide['Indicator Code'].isin(indicators)]
+    long = wide.melt(id_vars=['Country Code', 'Indicator Code'],
+                     value_vars=[str(y) for y in range(years[0], years[1] + 1)], var_name='date')
+    df = long.pivot_table(index=['Country Code', 'date'], columns='Indicator Code', values='value',
+                          aggfunc='first').reset_index()
+    registry = load_registry()
+    df.insert(0, 'Country', [registry.name(code) for code in df['Country Code']])
+    df['date'] = df['date'].astype(int)
+    df = df.rename(columns={'Country Code': 'ISO3', **indicators}).rename_axis(columns=None)
+    df = df[['Country', 'ISO3', 'date'] + [name for name in indicators.values() if name in df.columns]]
+    return df.sort_values(['Country', 'date'], ignore_index=True)
+
+
+@pytest.fixture
+def economies():
+    return load_registry().iso3[:12]
+
+
+@pytest.fixture
+def wdi_zip(tmp_path, economies):
+    path = str(tmp_path / 'WDI_CSV.zip')
+    write_wdi_zip(path, economies, 30, seed=1)
+    return path
+
+
+@pytest.fixture
+def wdi_csv(tmp_path, wdi_zip):
+    with zipfile.ZipFile(wdi_zip) as archive:
+        return archive.extract('WDICSV.csv', tmp_path / 'extracted')
+
+
+def test_matches_pandas_reference(wdi_zip, economies):
+    selected = economies[:5]
+    registry = load_registry()
+    df = read_wdi_bulk(wdi_zip, [registry.name(code) for code in selected], SELECTED, YEARS)
+    expected = reference(wdi_zip, selected, SELECTED, YEARS)
+    pd.testing.assert_frame_equal(df.astype({'ISO3': str}), expected, check_dtype=False)
+    assert isinstance(df['ISO3'].dtype, pd.CategoricalDtype)
+
+
+def test_all_economies_skip_aggregates(wdi_zip, economies):
+    df = read_wdi_bulk(wdi_zip, None, SELECTED, YEARS)
+    assert sorted(df['ISO3'].astype(str).unique()) == sorted(economies)
+
+
+def test_bare_csv_reads_like_zip(wdi_zip, wdi_csv, economies):
+    assert wdi_economies(wdi_zip) == economies
+    assert wdi_economies(wdi_csv) is None
+    pd.testing.assert_frame_equal(read_wdi_bulk(wdi_csv, economies[:5], SELECTED, YEARS),
+                                  read_wdi_bulk(wdi_zip, economies[:5], SELECTED, YEARS))
+    # Without WDICountry.csv every code in the file is read, aggregates included
+    codes = set(read_wdi_bulk(wdi_csv, None, SELECTED, YEARS)['ISO3'].astype(str))
+    assert codes >= set(economies)
+
+
+def test_empty_result_keeps_existing_file(tmp_path, wdi_zip, monkeypatch):
+    # The generated dump has none of the fetch stage's indicator codes
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('data')
+    with open('data/worldbank_data.csv', 'w') as f:
+        f.write('Country,date\n')
+    fetch_worldbank_data.main(bulk=wdi_zip)
+    with open('data/worldbank_data.csv') as f:
+        assert f.read() == 'Country,date\n'
+    assert not os.path.exists('data/worldbank_data.cols')